@@ -0,0 +1,232 @@
+"""
+Admission control: bounded concurrency with priority wait queues
+
+Without a limit every request under overload competes for the connection
+pool and waits up to the pool timeout, so all of them get slow. This
+middleware admits at most ADMISSION_MAX_CONCURRENCY requests per worker
+(default 15, the 5 + 10 overflow of the default pool); the rest wait in a
+bounded queue per class and are admitted reads (GET/HEAD/OPTIONS) first,
+then writes, oldest first within a class. A request is shed with 503 +
+Retry-After when its class queue is full (ADMISSION_READ_QUEUE_SIZE /
+ADMISSION_WRITE_QUEUE_SIZE) or it has waited ADMISSION_QUEUE_TIMEOUT_SECONDS.
+
+Routes can get a tighter limit of their own on top of the global one with
+ADMISSION_ROUTE_LIMITS, e.g. "GET /api/examples/export=2,POST
+/api/examples/bulk=4" (method and route template). Health checks, metrics and
+the change stream are never queued: they don't hold database connections
+while they run, and health must answer while the API is saturated.
+
+Limits are per worker process. Queue depths, in-flight counts and shed
+requests are published in /api/metrics.
+"""
+import asyncio
+import os
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+from starlette.routing import Match
+
+from metrics import admission_in_flight, admission_queue_depth, admission_shed_total
+
+# Priority classes, highest first
+READ = "read"
+WRITE = "write"
+CLASSES = (READ, WRITE)
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+# Always admitted (path prefixes)
+EXEMPT_PATHS = ("/api/health", "/api/metrics", "/api/examples/stream")
+
+SHED_BODY = b'{"detail":"Server is overloaded, retry later"}'
+
+
+class Limiter:
+    """
+    Concurrency limit whose waiters are admitted by class priority, each class queue bounded
+    """
+
+    def __init__(self, name: str, limit: int, queue_sizes: Dict[str, int], queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_sizes = queue_sizes
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: Dict[str, deque] = {name: deque() for name in CLASSES}
+
+    async def acquire(self, cls: str) -> Optional[str]:
+        """
+        Wait for a slot; None once admitted, else the reason to shed (queue_full, timeout)
+        """
+        if self.active < self.limit and not any(self._waiters.values()):
+            self._admitted(1)
+            return None
+        queue = self._waiters[cls]
+        if len(queue) >= self.queue_sizes[cls]:
+            return "queue_full"
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue.append(future)
+        admission_queue_depth.inc((self.name, cls))
+        timer = loop.call_later(self.queue_timeout, self._expire, cls, future)
+        try:
+            admitted = await future
+        except asyncio.CancelledError:
+            # Handed a slot just before the client went away: pass it on
+            if future.done() and not future.cancelled() and future.result():
+                self.release()
+            else:
+                self._withdraw(cls, future)
+            raise
+        finally:
+            timer.cancel()
+        return None if admitted else "timeout"
+
+    def release(self) -> None:
+        """
+        Free a slot, handing it straight to the highest-priority waiter if there is one
+        """
+        for cls in CLASSES:
+            queue = self._waiters[cls]
+            while queue:
+                future = queue.popleft()
+                admission_queue_depth.inc((self.name, cls), -1)
+                # A waiter cancelled (client gone) before its task could withdraw it
+                if future.done():
+                    continue
+                future.set_result(True)
+                return
+        self._admitted(-1)
+
+    def _admitted(self, delta: int) -> None:
+        self.active += delta
+        admission_in_flight.inc((self.name,), delta)
+
+    def _expire(self, cls: str, future: asyncio.Future) -> None:
+        if self._withdraw(cls, future) and not future.done():
+            future.set_result(False)
+
+    def _withdraw(self, cls: str, future: asyncio.Future) -> bool:
+        try:
+            self._waiters[cls].remove(future)
+        except ValueError:
+            return False
+        admission_queue_depth.inc((self.name, cls), -1)
+        return True
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware admitting requests through the global and per-route limiters
+    """
+
+    def __init__(
+        self,
+        app,
+        max_concurrency: int = 15,
+        queue_sizes: Optional[Dict[str, int]] = None,
+        queue_timeout: float = 2.0,
+        retry_after: int = 1,
+        route_limits: Optional[Dict[str, int]] = None,
+        exempt_routes: Iterable[str] = (),
+        routes: Optional[list] = None,
+    ):
+        self.app = app
+        self.queue_sizes = queue_sizes or {READ: 100, WRITE: 20}
+        self.queue_timeout = queue_timeout
+        self.retry_after = str(retry_after)
+        self.limiter = Limiter("global", max_concurrency, self.queue_sizes, queue_timeout)
+        # "METHOD /template" -> Limiter, or None for routes that skip admission
+        self.route_keys: Dict[str, Optional[Limiter]] = {
+            key: Limiter(key, limit, self.queue_sizes, queue_timeout) for key, limit in (route_limits or {}).items()
+        }
+        self.route_keys.update((key, None) for key in exempt_routes)
+        # The app's route list, filled in after the middleware is added
+        self.routes = routes
+
+    def _match_route(self, scope) -> Tuple[object, Optional[Limiter]]:
+        """
+        (route, its limiter) for a request: the first route that matches, as the router picks it
+        """
+        for route in self.routes or ():
+            if route.matches(scope)[0] == Match.FULL:
+                return route, self.route_keys.get(f"{scope['method']} {route.path}", self.limiter)
+        return None, self.limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        cls = READ if scope["method"] in READ_METHODS else WRITE
+        route, route_limiter = self._match_route(scope) if self.route_keys else (None, self.limiter)
+        if route_limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        acquired = []
+        try:
+            limiters = (self.limiter,) if route_limiter is self.limiter else (route_limiter, self.limiter)
+            for limiter in limiters:
+                reason = await limiter.acquire(cls)
+                if reason is not None:
+                    admission_shed_total.inc((limiter.name, cls, reason))
+                    await self.shed(scope, send, route)
+                    return
+                acquired.append(limiter)
+            await self.app(scope, receive, send)
+        finally:
+            for limiter in acquired:
+                limiter.release()
+
+    async def shed(self, scope, send, route) -> None:
+        # Label the 503 with its route in the request metrics (routing never ran)
+        if route is None:
+            route = next((r for r in self.routes or () if r.matches(scope)[0] == Match.FULL), None)
+        if route is not None:
+            scope["route"] = route
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(SHED_BODY)).encode()),
+                (b"retry-after", self.retry_after.encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": SHED_BODY})
+
+
+def parse_route_limits(value: str) -> Dict[str, int]:
+    """
+    Parse "GET /api/examples/export=2,POST /api/examples/bulk=4" into {"GET /api/examples/export": 2, ...}
+    """
+    limits = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        key, _, limit = entry.rpartition("=")
+        method, _, path = key.strip().partition(" ")
+        if not path.strip() or not limit.strip():
+            raise ValueError(f"Invalid ADMISSION_ROUTE_LIMITS entry '{entry.strip()}' (expected 'METHOD /path=limit')")
+        limits[f"{method.upper()} {path.strip()}"] = int(limit)
+    return limits
+
+
+def admission_enabled() -> bool:
+    return os.getenv("ADMISSION_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def admission_options() -> dict:
+    """
+    AdmissionControlMiddleware keyword arguments from environment variables
+    """
+    return {
+        "max_concurrency": int(os.getenv("ADMISSION_MAX_CONCURRENCY", "15")),
+        "queue_sizes": {
+            READ: int(os.getenv("ADMISSION_READ_QUEUE_SIZE", "100")),
+            WRITE: int(os.getenv("ADMISSION_WRITE_QUEUE_SIZE", "20")),
+        },
+        "queue_timeout": float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "2")),
+        "retry_after": int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1")),
+        "route_limits": parse_route_limits(os.getenv("ADMISSION_ROUTE_LIMITS", "")),
+    }
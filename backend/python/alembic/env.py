@@ -11,11 +11,8 @@ from alembic import context
 # Add parent directory to path to import our modules
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
-
-# Import Base and models for autogenerate support
+# Import Base and models for autogenerate support (database.py also loads .env;
+# its engines are created lazily, so none is built here besides Alembic's own)
 from database import Base
 from models import Example  # Import all models here
 
@@ -0,0 +1,27 @@
+"""Add example.version for If-Match optimistic concurrency
+
+Revision ID: a6d4c9e2f7b1
+Revises: f3b8d1e6a2c4
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d4c9e2f7b1'
+down_revision: Union[str, None] = 'f3b8d1e6a2c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant default: existing rows get version 1 without a table rewrite
+    op.add_column('example', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('example', 'version')
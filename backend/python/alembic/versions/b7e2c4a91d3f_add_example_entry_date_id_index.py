@@ -0,0 +1,31 @@
+"""Add composite (entry_date DESC, id DESC) index for keyset pagination
+
+Revision ID: b7e2c4a91d3f
+Revises: 8f9de85ec2cc
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c4a91d3f'
+down_revision: Union[str, None] = '8f9de85ec2cc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_example_entry_date_id',
+        'example',
+        [sa.text('entry_date DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_example_entry_date_id', table_name='example')
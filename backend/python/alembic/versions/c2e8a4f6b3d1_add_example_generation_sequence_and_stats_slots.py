@@ -0,0 +1,46 @@
+"""Add example_generation sequence for change event IDs and stripe example_daily_stats
+
+Revision ID: c2e8a4f6b3d1
+Revises: a6d4c9e2f7b1
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8a4f6b3d1'
+down_revision: Union[str, None] = 'a6d4c9e2f7b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Continue after the current generation so event IDs clients hold are never reused
+    op.execute("CREATE SEQUENCE example_generation")
+    op.execute(
+        "SELECT setval('example_generation', "
+        "COALESCE((SELECT generation FROM table_version WHERE name = 'example'), 0) + 1, false)"
+    )
+
+    # Existing counts become slot 0; writers spread over the other slots from now on
+    op.add_column('example_daily_stats', sa.Column('slot', sa.SmallInteger(), server_default='0', nullable=False))
+    op.drop_constraint('example_daily_stats_pkey', 'example_daily_stats', type_='primary')
+    op.create_primary_key('example_daily_stats_pkey', 'example_daily_stats', ['day', 'is_active', 'slot'])
+
+
+def downgrade() -> None:
+    # Fold the slots back into one row per (day, is_active)
+    op.execute(
+        "INSERT INTO example_daily_stats (day, is_active, slot, count) "
+        "SELECT day, is_active, -1, sum(count) FROM example_daily_stats GROUP BY 1, 2"
+    )
+    op.execute("DELETE FROM example_daily_stats WHERE slot <> -1")
+    op.drop_constraint('example_daily_stats_pkey', 'example_daily_stats', type_='primary')
+    op.drop_column('example_daily_stats', 'slot')
+    op.create_primary_key('example_daily_stats_pkey', 'example_daily_stats', ['day', 'is_active'])
+
+    op.execute("DROP SEQUENCE example_generation")
@@ -0,0 +1,35 @@
+"""Enable pg_trgm and add trigram GIN index on example.name
+
+Revision ID: c4d8f2a6e1b5
+Revises: b7e2c4a91d3f
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8f2a6e1b5'
+down_revision: Union[str, None] = 'b7e2c4a91d3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_example_name_trgm',
+        'example',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_example_name_trgm', table_name='example')
+    # The pg_trgm extension is left installed, other objects may depend on it
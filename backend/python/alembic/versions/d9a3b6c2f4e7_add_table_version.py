@@ -0,0 +1,32 @@
+"""Add table_version write-generation table for ETags
+
+Revision ID: d9a3b6c2f4e7
+Revises: c4d8f2a6e1b5
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a3b6c2f4e7'
+down_revision: Union[str, None] = 'c4d8f2a6e1b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    table_version = op.create_table(
+        'table_version',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('generation', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(table_version, [{'name': 'example', 'generation': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('table_version')
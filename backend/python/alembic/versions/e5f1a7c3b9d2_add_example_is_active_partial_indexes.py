@@ -0,0 +1,42 @@
+"""Add partial (entry_date DESC, id DESC) indexes for the isActive list filter
+
+Revision ID: e5f1a7c3b9d2
+Revises: d9a3b6c2f4e7
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f1a7c3b9d2'
+down_revision: Union[str, None] = 'd9a3b6c2f4e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_example_active_entry_date_id',
+        'example',
+        [sa.text('entry_date DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('is_active'),
+        sqlite_where=sa.text('is_active = 1'),
+    )
+    op.create_index(
+        'ix_example_inactive_entry_date_id',
+        'example',
+        [sa.text('entry_date DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_where=sa.text('NOT is_active'),
+        sqlite_where=sa.text('is_active = 0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_example_inactive_entry_date_id', table_name='example')
+    op.drop_index('ix_example_active_entry_date_id', table_name='example')
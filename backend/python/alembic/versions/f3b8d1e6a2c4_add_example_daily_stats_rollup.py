@@ -0,0 +1,38 @@
+"""Add example_daily_stats rollup (per-day counts by is_active) and backfill it
+
+Revision ID: f3b8d1e6a2c4
+Revises: e5f1a7c3b9d2
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d1e6a2c4'
+down_revision: Union[str, None] = 'e5f1a7c3b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'example_daily_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'is_active')
+    )
+    # Backfill; afterwards the write handlers keep it current (python stats.py rebuild repairs it)
+    op.execute(
+        "INSERT INTO example_daily_stats (day, is_active, count) "
+        "SELECT date(timezone('UTC', entry_date)), is_active, count(*) "
+        "FROM example GROUP BY 1, 2"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('example_daily_stats')
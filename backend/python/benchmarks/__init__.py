@@ -0,0 +1,5 @@
+"""
+Benchmarks for the Python backend
+
+Run from backend/python, e.g. `python -m benchmarks.async_db --help`
+"""
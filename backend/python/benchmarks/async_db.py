@@ -0,0 +1,122 @@
+"""
+Concurrent-request throughput: sync Session vs AsyncSession in async handlers
+
+Both variants serve the same list query from an `async def` handler, one through
+the blocking `SessionLocal` (the old `get_db` path) and one through
+`AsyncSessionLocal`. A per-request `--delay` simulates a slow query
+(`pg_sleep` on PostgreSQL, a sleeping SQL function on SQLite), which is where
+the sync path serializes every in-flight request on the event loop.
+
+Usage:
+    python -m benchmarks.async_db --rows 1000 --requests 200 --concurrency 50 --delay 0.02
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import configure_database, seed_examples, summarize
+
+
+def build_apps(delay: float, limit: int):
+    """
+    Build the "before" (sync session) and "after" (async session) apps
+    """
+    from fastapi import FastAPI
+    from sqlalchemy import event, select, text
+
+    import database
+    from models import Example
+    from schemas import ExampleResponse
+
+    if database.engine.dialect.name == "sqlite":
+        def register_sleep(dbapi_connection, connection_record):
+            dbapi_connection.create_function("bench_sleep", 1, lambda s: time.sleep(s) or 0)
+
+        event.listen(database.engine, "connect", register_sleep)
+        event.listen(database.async_engine.sync_engine, "connect", register_sleep)
+        database.engine.dispose()  # drop connections opened while seeding
+        sleep_sql = text("SELECT bench_sleep(:d)")
+    else:
+        sleep_sql = text("SELECT pg_sleep(:d)")
+
+    query = select(Example).order_by(Example.entry_date.desc()).limit(limit)
+
+    before = FastAPI()
+
+    @before.get("/api/examples")
+    async def list_sync():
+        with database.SessionLocal() as db:
+            if delay:
+                db.execute(sleep_sql, {"d": delay})
+            rows = db.execute(query).scalars().all()
+            return [ExampleResponse.model_validate(row) for row in rows]
+
+    after = FastAPI()
+
+    @after.get("/api/examples")
+    async def list_async():
+        async with database.AsyncSessionLocal() as db:
+            if delay:
+                await db.execute(sleep_sql, {"d": delay})
+            rows = (await db.execute(query)).scalars().all()
+            return [ExampleResponse.model_validate(row) for row in rows]
+
+    return before, after
+
+
+async def run_load(app, requests: int, concurrency: int) -> dict:
+    """
+    Fire `requests` GETs at the app with at most `concurrency` in flight
+    """
+    import httpx
+
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get("/api/examples")
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        await client.get("/api/examples")  # warm up pools
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    result = summarize(latencies, elapsed)
+    result["errors"] = errors
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to benchmark (default: DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=50, help="Rows returned per request")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.02, help="Simulated query latency in seconds")
+    args = parser.parse_args()
+
+    url = configure_database(args.database_url)
+    seed_examples(args.rows)
+    before, after = build_apps(args.delay, args.limit)
+
+    report = {
+        "database": url.split("@")[-1],
+        "params": vars(args) | {"database_url": None},
+        "sync_session": asyncio.run(run_load(before, args.requests, args.concurrency)),
+        "async_session": asyncio.run(run_load(after, args.requests, args.concurrency)),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
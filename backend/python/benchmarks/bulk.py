@@ -0,0 +1,229 @@
+"""
+Write throughput: single-row CRUD endpoints vs the bulk endpoints
+
+Creates, updates and deletes `--items` examples first one request per row
+(with `--concurrency` requests in flight) and then through
+POST/PATCH/DELETE /api/examples/bulk in batches of `--batch-size`, reporting
+items per second for each.
+
+With --check it instead verifies the bulk endpoints' per-item semantics and
+exits 1 on a mismatch: results come back per request index, invalid,
+duplicate and unknown items fail alone while the rest of the batch is
+written, and MAX_BULK_ITEMS items are accepted while one more is a 413 that
+writes nothing.
+
+Usage:
+    python -m benchmarks.bulk --items 2000 --batch-size 500 --concurrency 20
+    python -m benchmarks.bulk --check
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import configure_database, seed_examples
+
+
+async def run_single(client, items: int, concurrency: int) -> dict:
+    """
+    One request per item through POST, PUT and DELETE /api/examples
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    report = {}
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(
+        limited(client.post("/api/examples", json={"name": f"Single {i}", "title": "Bench"}))
+        for i in range(items)
+    ))
+    report["create_items_per_s"] = round(items / (time.perf_counter() - started), 1)
+    ids = [response.json()["id"] for response in responses]
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited(client.put(f"/api/examples/{id}", json={"title": "Updated"})) for id in ids))
+    report["update_items_per_s"] = round(items / (time.perf_counter() - started), 1)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(limited(client.delete(f"/api/examples/{id}")) for id in ids))
+    report["delete_items_per_s"] = round(items / (time.perf_counter() - started), 1)
+    return report
+
+
+async def run_bulk(client, items: int, batch_size: int) -> dict:
+    """
+    Batches of `batch_size` items through the bulk endpoints
+    """
+    batches = [range(start, min(start + batch_size, items)) for start in range(0, items, batch_size)]
+    report = {}
+    ids = []
+
+    started = time.perf_counter()
+    for batch in batches:
+        response = await client.post("/api/examples/bulk", json=[{"name": f"Bulk {i}", "title": "Bench"} for i in batch])
+        ids.extend(result["id"] for result in response.json()["results"])
+    report["create_items_per_s"] = round(items / (time.perf_counter() - started), 1)
+
+    id_batches = [ids[start:start + batch_size] for start in range(0, len(ids), batch_size)]
+    started = time.perf_counter()
+    for batch in id_batches:
+        await client.patch("/api/examples/bulk", json=[{"id": id, "title": "Updated"} for id in batch])
+    report["update_items_per_s"] = round(items / (time.perf_counter() - started), 1)
+
+    started = time.perf_counter()
+    for batch in id_batches:
+        await client.request("DELETE", "/api/examples/bulk", json={"ids": batch})
+    report["delete_items_per_s"] = round(items / (time.perf_counter() - started), 1)
+    return report
+
+
+def check(condition: bool, message: str, failures: list) -> None:
+    if not condition:
+        failures.append(message)
+
+
+def outcomes(response) -> list:
+    """
+    (index, success, id) per item of a bulk response
+    """
+    return [(result["index"], result["success"], result["id"]) for result in response.json()["results"]]
+
+
+async def check_bulk(client) -> dict:
+    """
+    Per-item outcomes and limits of POST/PATCH/DELETE /api/examples/bulk
+    """
+    from crud import MAX_BULK_ITEMS
+
+    failures = []
+    report = {}
+
+    async def example(id: int):
+        response = await client.get(f"/api/examples/{id}")
+        return response.json() if response.status_code == 200 else None
+
+    async def count() -> int:
+        return (await client.get("/api/examples/stats")).json()["total"]
+
+    # Create: invalid items fail alone, the others are inserted
+    response = await client.post("/api/examples/bulk", json=[
+        {"name": "Bulk a", "title": "Check"},
+        {"title": "No name"},
+        {"name": "Bulk b", "title": "Check"},
+        {"name": "x" * 201, "title": "Too long"},
+        "not an object",
+    ])
+    created = outcomes(response)
+    report["create_mixed"] = {"status": response.status_code, "results": created}
+    check(response.status_code == 200 and [(index, success) for index, success, _ in created]
+          == [(0, True), (1, False), (2, True), (3, False), (4, False)],
+          f"mixed create: {response.status_code} {created}", failures)
+    check(response.json().get("succeeded") == 2 and response.json().get("failed") == 3,
+          f"mixed create counts: {response.json()}", failures)
+    a, b = created[0][2], created[2][2]
+    check([(await example(id) or {}).get("name") for id in (a, b)] == ["Bulk a", "Bulk b"],
+          "valid items of a mixed create were not stored", failures)
+
+    # Update: duplicate, unknown and invalid items fail alone; the first of a duplicate wins
+    response = await client.patch("/api/examples/bulk", json=[
+        {"id": a, "title": "First"},
+        {"id": a, "title": "Second"},
+        {"id": 999_999_999, "title": "Missing"},
+        {"id": b, "name": ""},
+        {"title": "No id"},
+    ])
+    updated = outcomes(response)
+    report["update_mixed"] = {"status": response.status_code, "results": updated}
+    check(response.status_code == 200 and [(index, success) for index, success, _ in updated]
+          == [(0, True), (1, False), (2, False), (3, False), (4, False)],
+          f"mixed update: {response.status_code} {updated}", failures)
+    titles = [(await example(id) or {}).get("title") for id in (a, b)]
+    check(titles == ["First", "Check"], f"titles after the mixed update: {titles}", failures)
+
+    # Delete: repeated and unknown IDs fail alone
+    response = await client.request("DELETE", "/api/examples/bulk", json={"ids": [a, a, 999_999_999]})
+    deleted = outcomes(response)
+    report["delete_mixed"] = {"status": response.status_code, "results": deleted}
+    check(response.status_code == 200 and deleted == [(0, True, a), (1, False, a), (2, False, 999_999_999)],
+          f"mixed delete: {response.status_code} {deleted}", failures)
+    check(await example(a) is None and await example(b) is not None, "mixed delete removed the wrong rows", failures)
+
+    # Limits: MAX_BULK_ITEMS is accepted, one more is rejected as a whole before any write
+    total = await count()
+    statuses = {}
+    response = await client.post("/api/examples/bulk", json=[{"name": "Limit", "title": "Check"}] * (MAX_BULK_ITEMS + 1))
+    statuses["create_over"] = response.status_code
+    check(await count() == total, "an oversized create wrote rows", failures)
+    response = await client.post("/api/examples/bulk", json=[{"name": f"Limit {i}", "title": "Check"} for i in range(MAX_BULK_ITEMS)])
+    statuses["create_max"] = response.status_code
+    ids = [id for _, success, id in outcomes(response) if success] if response.status_code == 200 else []
+    check(len(ids) == MAX_BULK_ITEMS, f"create of {MAX_BULK_ITEMS} items stored {len(ids)}", failures)
+
+    response = await client.patch("/api/examples/bulk", json=[{"id": id, "title": "Over"} for id in ids + [b]])
+    statuses["update_over"] = response.status_code
+    check((await example(b))["title"] == "Check", "an oversized update changed rows", failures)
+    response = await client.patch("/api/examples/bulk", json=[{"id": id, "title": "Max"} for id in ids])
+    statuses["update_max"] = response.status_code
+    check(response.status_code == 200 and response.json()["succeeded"] == MAX_BULK_ITEMS,
+          f"update of {MAX_BULK_ITEMS} items: {response.status_code}", failures)
+
+    response = await client.request("DELETE", "/api/examples/bulk", json={"ids": ids + [b]})
+    statuses["delete_over"] = response.status_code
+    check(await count() == total + MAX_BULK_ITEMS, "an oversized delete removed rows", failures)
+    response = await client.request("DELETE", "/api/examples/bulk", json={"ids": ids})
+    statuses["delete_max"] = response.status_code
+    check(await count() == total, f"delete of {MAX_BULK_ITEMS} items left rows behind", failures)
+
+    statuses["create_empty"] = (await client.post("/api/examples/bulk", json=[])).status_code
+    statuses["update_not_array"] = (await client.patch("/api/examples/bulk", json={"id": b})).status_code
+    statuses["delete_empty"] = (await client.request("DELETE", "/api/examples/bulk", json={"ids": []})).status_code
+    report["statuses"] = statuses
+    expected = {"create_over": 413, "create_max": 200, "update_over": 413, "update_max": 200,
+                "delete_over": 413, "delete_max": 200, "create_empty": 400, "update_not_array": 400,
+                "delete_empty": 422}
+    for name, status in expected.items():
+        check(statuses[name] == status, f"{name}: {statuses[name]} instead of {status}", failures)
+
+    report["failures"] = failures
+    return report
+
+
+async def run(args) -> dict:
+    import httpx
+
+    from main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        if args.check:
+            return await check_bulk(client)
+        return {
+            "single_row": await run_single(client, args.items, args.concurrency),
+            "bulk": await run_bulk(client, args.items, args.batch_size),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to benchmark (default: DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--check", action="store_true", help="Check per-item results and limits instead of measuring")
+    args = parser.parse_args()
+
+    url = configure_database(args.database_url)
+    seed_examples(0)
+    report = {"database": url.split("@")[-1]}
+    if not args.check:
+        report.update(items=args.items, batch_size=args.batch_size)
+    report.update(asyncio.run(run(args)))
+    print(json.dumps(report, indent=2))
+    if report.get("failures"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+import os
+import statistics
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+
+def configure_database(url: str = None) -> str:
+    """
+    Point DATABASE_URL at the benchmark database before `database` is imported
+
+    Uses the given URL, then an existing DATABASE_URL, and falls back to a
+    throwaway SQLite file so the benchmarks run without PostgreSQL.
+    """
+    url = url or os.getenv("BENCH_DATABASE_URL") or os.getenv("DATABASE_URL")
+    if not url:
+        path = os.path.join(tempfile.mkdtemp(prefix="technight-bench-"), "bench.db")
+        url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = url
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    return url
+
+
+# Vocabulary for synthetic example names, so name search has realistic selectivity
+NAME_WORDS = (
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa",
+    "quebec", "romeo", "sierra", "tango", "uniform", "victor", "whiskey", "xray",
+    "yankee", "zulu", "feedback", "keynote", "workshop", "session", "speaker", "demo",
+)
+
+
+def example_name(i: int) -> str:
+    """
+    Deterministic synthetic name for the i-th seeded example
+    """
+    n = len(NAME_WORDS)
+    return f"{NAME_WORDS[i % n]} {NAME_WORDS[(i // n) % n]} {i}"
+
+
+def seed_examples(rows: int, reset: bool = True) -> None:
+    """
+    Create the schema (if needed) and insert `rows` synthetic examples
+
+    PostgreSQL is seeded server-side with generate_series, other databases
+    through batched executemany.
+    """
+    from sqlalchemy import text
+
+    from database import Base, engine
+    from models import Example
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as connection:
+        if reset:
+            connection.execute(Example.__table__.delete())
+        if engine.dialect.name == "postgresql":
+            words = "ARRAY[" + ", ".join(f"'{word}'" for word in NAME_WORDS) + "]"
+            connection.execute(text(f"""
+                INSERT INTO example (name, title, entry_date, description, is_active)
+                SELECT ({words})[1 + i % {len(NAME_WORDS)}] || ' ' ||
+                       ({words})[1 + (i / {len(NAME_WORDS)}) % {len(NAME_WORDS)}] || ' ' || i,
+                       'Title ' || (i % 50),
+                       :now - make_interval(mins => i),
+                       left(repeat('Benchmark description ', 40), 1000),
+                       i % 3 <> 0
+                FROM generate_series(0, :rows - 1) AS i
+            """), {"now": now, "rows": rows})
+            connection.execute(text("ANALYZE example"))
+            return
+        batch = []
+        for i in range(rows):
+            batch.append({
+                "name": example_name(i),
+                "title": f"Title {i % 50}",
+                "entry_date": now - timedelta(minutes=i),
+                "description": ("Benchmark description " * 40)[:1000],
+                "is_active": i % 3 != 0,
+            })
+            if len(batch) == 5000:
+                connection.execute(Example.__table__.insert(), batch)
+                batch = []
+        if batch:
+            connection.execute(Example.__table__.insert(), batch)
+
+
+def summarize(latencies: list, elapsed: float) -> dict:
+    """
+    Summarize request latencies (seconds) into throughput and percentiles (ms)
+    """
+    ordered = sorted(latencies)
+
+    def pct(p: float) -> float:
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "requests": len(ordered),
+        "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+    }
@@ -0,0 +1,149 @@
+"""
+Response compression: CPU cost vs bytes on the wire
+
+For list payloads of --sizes rows (seeded examples with 1000-char
+descriptions), reports for gzip and brotli (when installed) at several
+levels: compressed size and ratio, compression and decompression time, and
+the estimated time to deliver the response over a slow (event Wi-Fi) and a
+fast link, compared with sending it uncompressed. It also times
+the middleware's cached path (reusing compressed bytes for an unchanged
+ETag) and GET /api/examples through the app with and without Accept-Encoding.
+
+Usage:
+    python -m benchmarks.compression --rows 1000 --sizes 100 1000 --links 2 50
+"""
+import argparse
+import asyncio
+import json
+import time
+import zlib
+
+from benchmarks.common import configure_database, seed_examples
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 6, 11)}
+
+
+def best_time(function, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def decompress(payload: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        import brotli
+        return brotli.decompress(payload)
+    return zlib.decompress(payload, 16 + zlib.MAX_WBITS)
+
+
+def tradeoffs(body: bytes, links_mbit: list, repeat: int) -> dict:
+    """
+    Size and timing of each encoding/level for one payload
+    """
+    from compression import SUPPORTED_ENCODINGS, compress
+
+    def transfer_ms(size: int, mbit: float) -> float:
+        return size * 8 / (mbit * 1e6) * 1000
+
+    report = {
+        "identity": {
+            "bytes": len(body),
+            **{f"delivery_ms_at_{mbit}mbit": round(transfer_ms(len(body), mbit), 2) for mbit in links_mbit},
+        }
+    }
+    for encoding in SUPPORTED_ENCODINGS:
+        for level in LEVELS[encoding]:
+            payload = compress(body, encoding, level)
+            compress_ms = best_time(lambda: compress(body, encoding, level), repeat) * 1000
+            report[f"{encoding}-{level}"] = {
+                "bytes": len(payload),
+                "ratio": round(len(body) / len(payload), 1),
+                "compress_ms": round(compress_ms, 3),
+                "decompress_ms": round(best_time(lambda: decompress(payload, encoding), repeat) * 1000, 3),
+                # Server CPU plus wire time; client decompression is usually negligible next to both
+                **{
+                    f"delivery_ms_at_{mbit}mbit": round(compress_ms + transfer_ms(len(payload), mbit), 2)
+                    for mbit in links_mbit
+                },
+            }
+    return report
+
+
+def cached_path(body: bytes, repeat: int) -> dict:
+    """
+    Cost of a compression-cache hit (crc32 of the body + LRU lookup) vs compressing
+    """
+    from cache import LRUCache
+    from compression import CompressionMiddleware, SUPPORTED_ENCODINGS
+
+    middleware = CompressionMiddleware(app=None, cache=LRUCache(16, 300))
+    report = {}
+    for encoding in SUPPORTED_ENCODINGS:
+        middleware.compressed(body, encoding, '"1-bench"')
+        report[encoding] = {
+            "compress_ms": round(best_time(lambda: middleware.compressed(body, encoding, None), repeat) * 1000, 3),
+            "cache_hit_ms": round(best_time(lambda: middleware.compressed(body, encoding, '"1-bench"'), repeat) * 1000, 3),
+        }
+    return report
+
+
+async def through_app(limit: int, repeat: int) -> dict:
+    """
+    GET /api/examples?limit=N via the full middleware stack per Accept-Encoding
+    """
+    import httpx
+
+    from compression import SUPPORTED_ENCODINGS
+    from main import app
+
+    report = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for encoding in ("identity", *SUPPORTED_ENCODINGS):
+            headers = {"accept-encoding": encoding}
+            response = await client.get("/api/examples", params={"limit": limit}, headers=headers)
+            wire_bytes = len(response.content) if encoding == "identity" else int(response.headers["content-length"])
+            start = time.perf_counter()
+            for _ in range(repeat):
+                await client.get("/api/examples", params={"limit": limit}, headers=headers)
+            report[encoding] = {
+                "wire_bytes": wire_bytes,
+                "mean_ms": round((time.perf_counter() - start) / repeat * 1000, 3),
+            }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to benchmark (default: DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--rows", type=int, default=1000, help="Examples to seed")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Rows per list payload")
+    parser.add_argument("--links", type=float, nargs="+", default=[2, 50], help="Link speeds in Mbit/s")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    configure_database(args.database_url)
+    seed_examples(args.rows)
+
+    from sqlalchemy import select
+
+    import database
+    from pagination import KEYSET_ORDER
+    from serialization import EXAMPLE_COLUMNS, encode_examples
+
+    with database.SessionLocal() as session:
+        rows = session.execute(select(*EXAMPLE_COLUMNS).order_by(*KEYSET_ORDER).limit(max(args.sizes))).all()
+
+    report = {"payloads": {}}
+    for size in args.sizes:
+        report["payloads"][f"{size}_rows"] = tradeoffs(encode_examples(rows[:size]), args.links, args.repeat)
+    largest = encode_examples(rows[:max(args.sizes)])
+    report["cache_reuse"] = cached_path(largest, args.repeat)
+    report["through_app"] = asyncio.run(through_app(max(args.sizes), args.repeat))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Sparse fieldsets: full rows vs `fields=` on large list pages
+
+Seeds examples (1000-char descriptions) and measures, through the app with
+identity encoding, response size and latency of GET /api/examples and
+/api/examples/search for the full representation and for each --fields
+value. It also times the database fetch alone (all columns vs the sparse
+column select) to separate I/O from encoding.
+
+Usage:
+    python -m benchmarks.fields --rows 10000 --limit 1000 --fields id,name,isActive id,name
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import configure_database, seed_examples, summarize
+
+
+async def through_app(path: str, params: dict, field_sets: list, repeat: int) -> dict:
+    """
+    Wire bytes and latency per fields value for one endpoint
+    """
+    import httpx
+
+    from main import app
+
+    report = {}
+    headers = {"accept-encoding": "identity"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for fields in (None, *field_sets):
+            query = dict(params, **({"fields": fields} if fields else {}))
+            response = await client.get(path, params=query, headers=headers)
+            response.raise_for_status()
+            latencies = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                await client.get(path, params=query, headers=headers)
+                latencies.append(time.perf_counter() - start)
+            report[fields or "full"] = {"bytes": len(response.content), **summarize(latencies, sum(latencies))}
+    return report
+
+
+def fetch_only(limit: int, field_sets: list, repeat: int) -> dict:
+    """
+    Best time of the list SELECT alone, full columns vs select_columns(fields)
+    """
+    from sqlalchemy import select
+
+    import database
+    from pagination import KEYSET_ORDER
+    from serialization import parse_fields, select_columns
+
+    report = {}
+    with database.SessionLocal() as session:
+        for fields in (None, *field_sets):
+            query = select(*select_columns(parse_fields(fields))).order_by(*KEYSET_ORDER).limit(limit)
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                session.execute(query).all()
+                best = min(best, time.perf_counter() - start)
+            report[fields or "full"] = {"fetch_ms": round(best * 1000, 3)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to benchmark (default: DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--rows", type=int, default=10_000, help="Examples to seed")
+    parser.add_argument("--limit", type=int, default=1000, help="Page size")
+    parser.add_argument("--fields", nargs="+", default=["id,name,isActive"], help="fields= values to compare")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    configure_database(args.database_url)
+    seed_examples(args.rows)
+
+    report = {
+        "list": asyncio.run(through_app("/api/examples", {"limit": args.limit}, args.fields, args.repeat)),
+        "search": asyncio.run(through_app(
+            "/api/examples/search", {"name": "a", "limit": args.limit}, args.fields, args.repeat,
+        )),
+        "fetch_only": fetch_only(args.limit, args.fields, args.repeat),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
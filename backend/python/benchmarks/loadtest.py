@@ -0,0 +1,340 @@
+"""
+End-to-end load test of the examples API
+
+Seeds synthetic examples, starts the API in a uvicorn subprocess (or targets
+a running server with --url) and drives it with a closed-loop asyncio load
+generator: --concurrency virtual users each send requests back to back for
+--duration seconds, picking operations by the weights of a scenario mix.
+Per scenario and per operation it reports RPS, mean/p50/p95/p99 latency and
+error counts as JSON.
+
+Scenarios (see SCENARIOS): read-heavy, list, search, by-id, write-burst, mixed.
+
+Compare mode flags regressions against a stored baseline report: a latency
+percentile more than --threshold percent higher, RPS more than --threshold
+percent lower, or a higher error rate. It exits non-zero if anything
+regressed.
+
+Usage:
+    python -m benchmarks.loadtest run --rows 10000 --concurrency 32 --duration 20 --output baseline.json
+    python -m benchmarks.loadtest run --scenario read-heavy --baseline baseline.json
+    python -m benchmarks.loadtest compare baseline.json current.json --threshold 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.common import NAME_WORDS, configure_database, seed_examples, summarize
+
+# Operation weights per scenario
+SCENARIOS = {
+    "read-heavy": {"list": 60, "by_id": 30, "search": 10},
+    "list": {"list": 100},
+    "search": {"search": 100},
+    "by-id": {"by_id": 100},
+    "write-burst": {"create": 60, "update": 30, "delete": 10},
+    "mixed": {"list": 35, "by_id": 30, "search": 15, "create": 12, "update": 5, "delete": 3},
+}
+
+# Metrics compared by compare mode, and whether higher is better
+COMPARED_METRICS = {"rps": True, "p50_ms": False, "p95_ms": False, "p99_ms": False}
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LoadState:
+    """
+    IDs the virtual users operate on
+
+    Reads and updates pick from the seeded IDs; deletes only remove examples
+    created during the run, so reads keep hitting existing rows.
+    """
+
+    def __init__(self, seeded_ids: list):
+        self.seeded_ids = seeded_ids
+        self.created_ids: list = []
+
+
+async def op_list(client, state: LoadState, rng: random.Random):
+    return await client.get("/api/examples", params={"limit": 50})
+
+
+async def op_search(client, state: LoadState, rng: random.Random):
+    return await client.get("/api/examples/search", params={"name": rng.choice(NAME_WORDS), "limit": 20})
+
+
+async def op_by_id(client, state: LoadState, rng: random.Random):
+    return await client.get(f"/api/examples/{rng.choice(state.seeded_ids)}")
+
+
+async def op_create(client, state: LoadState, rng: random.Random):
+    response = await client.post("/api/examples", json={
+        "name": f"{rng.choice(NAME_WORDS)} load {rng.randrange(1_000_000)}",
+        "title": "Load test",
+        "description": "Created by benchmarks.loadtest",
+    })
+    if response.status_code == 201:
+        state.created_ids.append(response.json()["id"])
+    return response
+
+
+async def op_update(client, state: LoadState, rng: random.Random):
+    return await client.put(f"/api/examples/{rng.choice(state.seeded_ids)}", json={
+        "title": f"Updated {rng.randrange(1000)}",
+    })
+
+
+async def op_delete(client, state: LoadState, rng: random.Random):
+    if not state.created_ids:
+        return await op_create(client, state, rng)
+    index = rng.randrange(len(state.created_ids))
+    state.created_ids[index], state.created_ids[-1] = state.created_ids[-1], state.created_ids[index]
+    return await client.delete(f"/api/examples/{state.created_ids.pop()}")
+
+
+OPERATIONS = {
+    "list": op_list,
+    "search": op_search,
+    "by_id": op_by_id,
+    "create": op_create,
+    "update": op_update,
+    "delete": op_delete,
+}
+
+
+async def run_scenario(base_url: str, mix: dict, state: LoadState, concurrency: int,
+                       duration: float, warmup: float, seed: int) -> dict:
+    """
+    Drive one scenario and summarize it overall and per operation
+    """
+    import httpx
+
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    statuses: dict = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def user(worker: int, until: float, record: bool):
+            rng = random.Random(seed * 1000 + worker)
+            while time.perf_counter() < until:
+                name = rng.choices(names, weights)[0]
+                start = time.perf_counter()
+                try:
+                    response = await OPERATIONS[name](client, state, rng)
+                    status = response.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed = time.perf_counter() - start
+                if not record:
+                    continue
+                latencies[name].append(elapsed)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+                if not isinstance(status, int) or status >= 400:
+                    errors[name] += 1
+
+        if warmup > 0:
+            until = time.perf_counter() + warmup
+            await asyncio.gather(*(user(i, until, False) for i in range(concurrency)))
+
+        start = time.perf_counter()
+        until = start + duration
+        await asyncio.gather(*(user(i, until, True) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    def with_errors(summary: dict, error_count: int) -> dict:
+        summary["errors"] = error_count
+        summary["error_rate"] = round(error_count / summary["requests"], 4) if summary["requests"] else 0.0
+        return summary
+
+    overall = with_errors(
+        summarize([value for values in latencies.values() for value in values], elapsed),
+        sum(errors.values()),
+    )
+    overall["statuses"] = statuses
+    return {
+        "overall": overall,
+        "operations": {name: with_errors(summarize(latencies[name], elapsed), errors[name]) for name in names},
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int) -> tuple:
+    """
+    Start the API under uvicorn in a subprocess, return (process, base URL) once it answers
+    """
+    import httpx
+
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=BACKEND_DIR,
+        env=dict(os.environ, WEB_CONCURRENCY=str(workers), CACHE_SINGLE_PROCESS="true" if workers == 1 else "false"),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise SystemExit("Server did not become ready within 30s")
+
+
+def stop_server(process) -> None:
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def seeded_ids(base_url: str, count: int = 1000) -> list:
+    import httpx
+
+    response = httpx.get(f"{base_url}/api/examples", params={"limit": count}, timeout=30)
+    response.raise_for_status()
+    ids = [example["id"] for example in response.json()]
+    if not ids:
+        raise SystemExit("No examples to load test against; seed with --rows")
+    return ids
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """
+    Regressions of `current` against `baseline`, as human-readable strings
+    """
+    regressions = []
+    for scenario, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(scenario)
+        if base is None:
+            continue
+        sections = [("overall", base["overall"], result["overall"])]
+        sections += [
+            (operation, base["operations"][operation], stats)
+            for operation, stats in result["operations"].items()
+            if operation in base["operations"]
+        ]
+        for section, old, new in sections:
+            for metric, higher_is_better in COMPARED_METRICS.items():
+                before, after = old.get(metric), new.get(metric)
+                if not before or after is None:
+                    continue
+                change = (after - before) / before * 100
+                if (-change if higher_is_better else change) > threshold:
+                    regressions.append(f"{scenario}/{section} {metric}: {before} -> {after} ({change:+.1f}%)")
+            if new.get("error_rate", 0) > old.get("error_rate", 0):
+                regressions.append(f"{scenario}/{section} error_rate: {old.get('error_rate', 0)} -> {new['error_rate']}")
+    return regressions
+
+
+def report_regressions(baseline_path: str, current: dict, threshold: float) -> int:
+    with open(baseline_path) as handle:
+        baseline = json.load(handle)
+    regressions = compare(baseline, current, threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions beyond {threshold}% against {baseline_path}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def run(args) -> int:
+    process = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+        database = "external"
+    else:
+        url = configure_database(args.database_url)
+        database = url.split("@")[-1]
+        if args.rows:
+            seed_examples(args.rows)
+        process, base_url = start_server(args.workers)
+
+    try:
+        state = LoadState(seeded_ids(base_url))
+        scenarios = {}
+        for name in args.scenario or list(SCENARIOS):
+            scenarios[name] = asyncio.run(run_scenario(
+                base_url, SCENARIOS[name], state, args.concurrency, args.duration, args.warmup, args.seed,
+            ))
+            print(f"{name}: {scenarios[name]['overall']['rps']} rps, "
+                  f"p99 {scenarios[name]['overall']['p99_ms']} ms, "
+                  f"{scenarios[name]['overall']['errors']} errors", file=sys.stderr)
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "database": database,
+            "rows": args.rows,
+            "workers": args.workers if not args.url else None,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+        },
+        "scenarios": scenarios,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output + "\n")
+    print(output)
+    return report_regressions(args.baseline, report, args.threshold) if args.baseline else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run scenarios and report (optionally against a baseline)")
+    run_parser.add_argument("--url", help="Target a running server instead of starting one")
+    run_parser.add_argument("--database-url", help="Database for the started server (default: DATABASE_URL or a temp SQLite file)")
+    run_parser.add_argument("--rows", type=int, default=10_000, help="Examples to seed (0 keeps existing data)")
+    run_parser.add_argument("--workers", type=int, default=1)
+    run_parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Repeatable; default: all")
+    run_parser.add_argument("--concurrency", type=int, default=32)
+    run_parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds per scenario")
+    run_parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each scenario")
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--output", help="Write the JSON report to this file")
+    run_parser.add_argument("--baseline", help="Baseline report to compare against")
+    run_parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+
+    compare_parser = commands.add_parser("compare", help="Compare two stored reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        with open(args.current) as handle:
+            current = json.load(handle)
+        raise SystemExit(report_regressions(args.baseline, current, args.threshold))
+    raise SystemExit(run(args))
+
+
+if __name__ == "__main__":
+    main()
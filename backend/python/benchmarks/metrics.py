@@ -0,0 +1,167 @@
+"""
+Instrumentation cost of /api/metrics collection
+
+Measures, per operation, what the metrics layer adds:
+
+- MetricsMiddleware around a trivial ASGI app vs the bare app (pure
+  middleware overhead, no HTTP client or routing noise)
+- `SELECT 1` through an engine with and without the cursor-execute listeners
+- a full GET /api/health through the real app with and without the middleware
+- rendering the exposition text, single worker and merged from snapshot files
+
+Usage:
+    python -m benchmarks.metrics --repeat 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+
+def per_call_us(total_seconds: float, repeat: int) -> float:
+    return round(total_seconds / repeat * 1e6, 3)
+
+
+async def asgi_overhead(repeat: int) -> dict:
+    """
+    Middleware cost around an app that answers immediately
+    """
+    from metrics import MetricsMiddleware
+
+    async def bare(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    wrapped = MetricsMiddleware(bare)
+    report = {}
+    for label, app in (("bare_us", bare), ("instrumented_us", wrapped)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            scope = {"type": "http", "method": "GET", "path": "/api/health"}
+            await app(scope, receive, send)
+        report[label] = per_call_us(time.perf_counter() - start, repeat)
+    report["overhead_us"] = round(report["instrumented_us"] - report["bare_us"], 3)
+    return report
+
+
+def statement_overhead(repeat: int, rounds: int = 5) -> dict:
+    """
+    Cursor-execute listener cost on SELECT 1 against in-memory SQLite (best of `rounds`)
+
+    `empty_listeners_us` isolates SQLAlchemy's own event dispatch from the
+    work done in the metrics listeners.
+    """
+    from sqlalchemy import create_engine, event, text
+
+    from metrics import instrument_engine
+
+    def empty_listeners(engine):
+        event.listen(engine, "before_cursor_execute", lambda *args: None)
+        event.listen(engine, "after_cursor_execute", lambda *args: None)
+
+    report = {}
+    for label, setup in (("plain_us", None), ("empty_listeners_us", empty_listeners), ("instrumented_us", instrument_engine)):
+        engine = create_engine("sqlite://")
+        if setup:
+            setup(engine)
+        statement = text("SELECT 1")
+        best = float("inf")
+        with engine.connect() as connection:
+            connection.execute(statement)
+            for _ in range(rounds):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    connection.execute(statement)
+                best = min(best, time.perf_counter() - start)
+        report[label] = per_call_us(best, repeat)
+        engine.dispose()
+    report["overhead_us"] = round(report["instrumented_us"] - report["plain_us"], 3)
+    return report
+
+
+async def request_overhead(repeat: int) -> dict:
+    """
+    GET /api/health through the full app, with and without MetricsMiddleware
+    """
+    import httpx
+
+    from main import app
+    from metrics import MetricsMiddleware
+
+    bare = app.build_middleware_stack()
+    layer = bare
+    while hasattr(layer, "app"):
+        if isinstance(layer.app, MetricsMiddleware):
+            layer.app = layer.app.app
+        layer = layer.app
+
+    report = {}
+    for label, stack in (("bare_us", bare), ("instrumented_us", app.build_middleware_stack())):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=stack), base_url="http://bench") as client:
+            await client.get("/api/health")
+            start = time.perf_counter()
+            for _ in range(repeat):
+                await client.get("/api/health")
+            report[label] = per_call_us(time.perf_counter() - start, repeat)
+    report["overhead_us"] = round(report["instrumented_us"] - report["bare_us"], 3)
+    return report
+
+
+def render_cost(repeat: int) -> dict:
+    """
+    Exposition rendering time with the series accumulated so far, locally and merged from 4 worker files
+    """
+    from metrics import MultiprocessStore, http_requests_total, registry, render_metrics
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        render_metrics(None)
+    local = per_call_us(time.perf_counter() - start, repeat)
+
+    store = MultiprocessStore(tempfile.mkdtemp(prefix="technight-metrics-"), flush_seconds=5)
+    for worker in range(4):
+        store.path = os.path.join(store.directory, f"metrics-{worker}.json")
+        store.flush()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        merged = registry.render(store.snapshots())
+    requests = sum(http_requests_total.series.values())
+    merged_requests = sum(
+        float(line.rsplit(" ", 1)[1]) for line in merged.splitlines() if line.startswith("http_requests_total{")
+    )
+    if merged_requests != 4 * requests:
+        raise SystemExit(f"Merged request count {merged_requests} != 4 x {requests}")
+    return {
+        "series": sum(len(metric.series) for metric in registry.metrics),
+        "render_local_us": local,
+        "render_merged_4_workers_us": per_call_us(time.perf_counter() - start, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20_000)
+    args = parser.parse_args()
+
+    os.environ.pop("DATABASE_URL", None)
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+
+    report = {
+        "middleware": asyncio.run(asgi_overhead(args.repeat)),
+        "statement": statement_overhead(args.repeat),
+        "request": asyncio.run(request_overhead(max(1, args.repeat // 10))),
+        "render": render_cost(max(1, args.repeat // 100)),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Micro-benchmarks for the per-request CPU stages of the examples API
+
+Each stage runs in isolation at 1, 100 and 10,000 rows (--sizes):
+
+- orm_hydration: SELECT into `Example` instances (in-memory SQLite)
+- tuple_fetch: the same SELECT as EXAMPLE_COLUMNS tuples, for comparison
+- orm_construct: building `Example(**values)` objects without a database
+- validate_response: ORM objects into ExampleResponse (from_attributes)
+- validate_create_dto / validate_update_dto: request payloads into CreateExampleDto / UpdateExampleDto
+- encode_response_model: ExampleResponse dump + json.dumps (FastAPI's response_model path)
+- encode_pydantic_json: ExampleResponse model_dump_json (pydantic-core encoder)
+- encode_orjson: serialization.encode_examples on column tuples
+
+Timing works like pytest-benchmark: the number of iterations per round is
+calibrated to last at least --min-time, and min/median/mean/stddev are taken
+over --rounds rounds. tracemalloc reports the peak and retained allocations of
+one extra call. --save stores the results. --compare checks them against a
+saved file and exits 1 when a stage's best (min) time or peak memory
+regressed by more than --threshold percent; the minimum is the least
+noise-sensitive statistic on a shared machine.
+
+Usage:
+    python -m benchmarks.micro --save micro-baseline.json
+    python -m benchmarks.micro --compare micro-baseline.json --threshold 15
+    python -m benchmarks.micro --stage encode_orjson --stage encode_response_model --sizes 10000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+DEFAULT_SIZES = (1, 100, 10_000)
+
+
+def payloads(rows: int) -> List[dict]:
+    """
+    Synthetic Example column values, like benchmarks.common.seed_examples
+    """
+    from benchmarks.common import example_name
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return [
+        {
+            "name": example_name(i),
+            "title": f"Title {i % 50}",
+            "entry_date": now - timedelta(minutes=i),
+            "description": ("Benchmark description " * 40)[:1000],
+            "is_active": i % 3 != 0,
+        }
+        for i in range(rows)
+    ]
+
+
+class Fixtures:
+    """
+    Shared inputs: an in-memory database holding max(sizes) rows, plus ORM objects and tuples
+    """
+
+    def __init__(self, rows: int):
+        from sqlalchemy import create_engine, insert
+        from sqlalchemy.orm import Session
+
+        from database import Base
+        from models import Example
+
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.values = payloads(rows)
+        with self.engine.begin() as connection:
+            connection.execute(insert(Example), self.values)
+        self.session = Session(self.engine)
+
+
+def stages(fixtures: Fixtures, rows: int) -> Dict[str, Callable]:
+    """
+    Callables for every stage at the given row count, with inputs prepared up front
+    """
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+
+    from models import Example
+    from schemas import CreateExampleDto, ExampleResponse, UpdateExampleDto
+    from serialization import EXAMPLE_COLUMNS, encode_examples
+
+    session = fixtures.session
+    response_adapter = TypeAdapter(List[ExampleResponse])
+    orm_query = select(Example).order_by(Example.id).limit(rows)
+    tuple_query = select(*EXAMPLE_COLUMNS).order_by(Example.id).limit(rows)
+
+    session.expunge_all()
+    objects = session.execute(orm_query).scalars().all()
+    tuples = session.execute(tuple_query).all()
+    validated = response_adapter.validate_python(objects, from_attributes=True)
+    values = fixtures.values[:rows]
+    create_bodies = [
+        {"name": v["name"], "title": v["title"], "description": v["description"], "isActive": v["is_active"]}
+        for v in values
+    ]
+    update_bodies = [{"title": v["title"], "isActive": v["is_active"]} for v in values]
+
+    def orm_hydration():
+        session.expunge_all()
+        return session.execute(orm_query).scalars().all()
+
+    def encode_response_model():
+        content = response_adapter.dump_python(validated, mode="json", by_alias=True)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+    return {
+        "orm_hydration": orm_hydration,
+        "tuple_fetch": lambda: session.execute(tuple_query).all(),
+        "orm_construct": lambda: [Example(**v) for v in values],
+        "validate_response": lambda: response_adapter.validate_python(objects, from_attributes=True),
+        "validate_create_dto": lambda: [CreateExampleDto.model_validate(body) for body in create_bodies],
+        "validate_update_dto": lambda: [UpdateExampleDto.model_validate(body) for body in update_bodies],
+        "encode_response_model": encode_response_model,
+        "encode_pydantic_json": lambda: response_adapter.dump_json(validated, by_alias=True),
+        "encode_orjson": lambda: encode_examples(tuples),
+    }
+
+
+def bench(function: Callable, rounds: int, min_time: float) -> dict:
+    """
+    pytest-benchmark style timing plus tracemalloc of one call
+    """
+    function()  # warm up caches and lazy imports
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        if time.perf_counter() - start >= min_time or iterations >= 1_000_000:
+            break
+        iterations *= 2
+
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        times.append((time.perf_counter() - start) / iterations)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = function()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return {
+        "min_us": round(min(times) * 1e6, 2),
+        "median_us": round(statistics.median(times) * 1e6, 2),
+        "mean_us": round(statistics.fmean(times) * 1e6, 2),
+        "stddev_us": round(statistics.stdev(times) * 1e6, 2) if len(times) > 1 else 0.0,
+        "ops": round(1 / statistics.median(times), 1),
+        "rounds": rounds,
+        "iterations": iterations,
+        "peak_alloc_kib": round((peak - before) / 1024, 2),
+        "retained_kib": round((retained - before) / 1024, 2),
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """
+    Stages whose min time or peak allocation grew by more than `threshold` percent
+    """
+    regressions = []
+    for size, results in current["results"].items():
+        for stage, stats in results.items():
+            old = baseline.get("results", {}).get(size, {}).get(stage)
+            if old is None:
+                continue
+            for metric in ("min_us", "peak_alloc_kib"):
+                before, after = old[metric], stats[metric]
+                if before and (after - before) / before * 100 > threshold:
+                    regressions.append(
+                        f"{stage}[{size}] {metric}: {before} -> {after} ({(after - before) / before * 100:+.1f}%)"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--stage", action="append", help="Repeatable; default: all stages")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per round")
+    parser.add_argument("--save", help="Write the results to this file")
+    parser.add_argument("--compare", help="Baseline results to check against")
+    parser.add_argument("--threshold", type=float, default=15.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    # The stages use their own in-memory database, never the app's
+    os.environ.pop("DATABASE_URL", None)
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+
+    fixtures = Fixtures(max(args.sizes))
+    results = {}
+    for size in args.sizes:
+        available = stages(fixtures, size)
+        unknown = set(args.stage or ()) - set(available)
+        if unknown:
+            raise SystemExit(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+        results[str(size)] = {
+            name: bench(function, args.rounds, args.min_time)
+            for name, function in available.items()
+            if not args.stage or name in args.stage
+        }
+        summary = ", ".join(f"{name} {stats['median_us']}us" for name, stats in results[str(size)].items())
+        print(f"[{size} rows] {summary}", file=sys.stderr)
+
+    report = {"python": sys.version.split()[0], "results": results}
+    output = json.dumps(report, indent=2)
+    if args.save:
+        with open(args.save, "w") as handle:
+            handle.write(output + "\n")
+    print(output)
+
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(json.load(handle), report, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            raise SystemExit(1)
+        print(f"No regressions beyond {args.threshold}% against {args.compare}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+OpenAPI document serving: per-request rendering vs the cached documents
+
+Times rendering the spec the old way (app.openapi() + JSON / PyYAML dump on
+every request) against serving openapi_docs' cached bytes, and checks that the
+cached JSON and YAML documents decode to exactly app.openapi(). Exits
+non-zero if they don't.
+
+Usage:
+    python -m benchmarks.openapi --repeat 200
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import yaml
+
+
+def time_per_call(function, repeat: int) -> float:
+    """
+    Mean microseconds per call
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return round((time.perf_counter() - start) / repeat * 1e6, 1)
+
+
+async def fetch_times(app, repeat: int) -> dict:
+    """
+    Mean microseconds per request for cached documents, identity and gzip
+    """
+    import httpx
+
+    report = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for path in ("/api/openapi.json", "/api/openapi.yaml"):
+            for encoding in ("identity", "gzip"):
+                await client.get(path, headers={"accept-encoding": encoding})
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    await client.get(path, headers={"accept-encoding": encoding})
+                report[f"GET {path} ({encoding})"] = round((time.perf_counter() - start) / repeat * 1e6, 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    from main import app, openapi_documents
+
+    schema = app.openapi()
+    if json.loads(openapi_documents.get("json").body) != schema:
+        raise SystemExit("Cached OpenAPI JSON does not match app.openapi()")
+    if yaml.safe_load(openapi_documents.get("yaml").body) != schema:
+        raise SystemExit("Cached OpenAPI YAML does not match app.openapi()")
+
+    def render_json():
+        app.openapi_schema = None
+        return json.dumps(app.openapi())
+
+    def render_yaml():
+        app.openapi_schema = None
+        return yaml.dump(app.openapi(), default_flow_style=False)
+
+    report = {
+        "render_per_request_us": {
+            "json": time_per_call(render_json, args.repeat),
+            "yaml": time_per_call(render_yaml, max(1, args.repeat // 10)),
+        },
+        "cached_document_us": time_per_call(lambda: openapi_documents.get("yaml"), args.repeat),
+        "cached_request_us": asyncio.run(fetch_times(app, args.repeat)),
+        "documents_match_app_openapi": True,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
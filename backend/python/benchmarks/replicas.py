@@ -0,0 +1,161 @@
+"""
+Read/write split check against local databases
+
+Creates a primary and two "replica" SQLite files, each holding a different
+marker row, points DATABASE_URL / DATABASE_READ_URL at them and checks
+through the app that:
+
+- reads alternate between the replicas (round-robin) and writes hit the primary
+- exports read from a replica too
+- a client that just wrote reads from the primary until its cookie expires,
+  and so does a cookieless client echoing the X-Read-Primary-Until header
+- a broken replica is taken out of rotation and returns after a successful probe
+
+Also reports mean read latency per target. Exits non-zero if a check fails.
+
+Usage:
+    python -m benchmarks.replicas --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+
+
+def create_database(path: str, marker: str) -> str:
+    """
+    Create the schema in a SQLite file with one marker example, return its URL
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from database import Base
+    from models import Example
+
+    url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(Example(name=marker, title="marker", is_active=True))
+        session.commit()
+    engine.dispose()
+    return url
+
+
+def source(response) -> str:
+    """
+    Which database served a list response, from its marker row
+    """
+    names = {example["name"] for example in response.json()}
+    for marker in ("primary", "replica-a", "replica-b"):
+        if marker in names:
+            return marker
+    return "unknown"
+
+
+def check(condition: bool, message: str, failures: list) -> None:
+    if not condition:
+        failures.append(message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Reads per latency measurement")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="technight-replicas-")
+    paths = {name: os.path.join(directory, f"{name}.db") for name in ("primary", "replica-a", "replica-b")}
+    os.environ["DATABASE_URL"] = f"sqlite:///{paths['primary']}"
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ["READ_YOUR_WRITES_SECONDS"] = "1"
+    os.environ["REPLICA_RETRY_SECONDS"] = "60"
+    os.environ["CACHE_ENABLED"] = "false"
+    urls = {name: create_database(path, name) for name, path in paths.items()}
+    os.environ["DATABASE_READ_URL"] = f"{urls['replica-a']},{urls['replica-b']}"
+
+    from fastapi.testclient import TestClient
+
+    from main import app, database_prober
+    from replicas import read_replicas
+
+    failures = []
+    report = {}
+    client = TestClient(app)
+
+    served = [source(client.get("/api/examples")) for _ in range(4)]
+    report["round_robin"] = served
+    check(sorted(set(served)) == ["replica-a", "replica-b"] and served[0] != served[1],
+          f"reads did not alternate between replicas: {served}", failures)
+
+    exported = client.get("/api/examples/export")
+    export_source = next((marker for marker in ("primary", "replica-a", "replica-b") if f'"{marker}"' in exported.text), "unknown")
+    report["export"] = export_source
+    check(exported.status_code == 200 and export_source.startswith("replica"), f"export served by {export_source}", failures)
+
+    created = client.post("/api/examples", json={"name": "written", "title": "t"})
+    check(created.status_code == 201, f"create returned {created.status_code}", failures)
+    after_write = source(client.get("/api/examples"))
+    report["read_after_write"] = after_write
+    check(after_write == "primary", f"read after own write served by {after_write}", failures)
+
+    other_client = TestClient(app)
+    other = source(other_client.get("/api/examples"))
+    report["other_client_after_write"] = other
+    check(other.startswith("replica"), f"another client's read served by {other}", failures)
+
+    # A cross-origin browser client: no cookies, echoes the header instead
+    cookieless = TestClient(app)
+    written = cookieless.post("/api/examples", json={"name": "written by header client", "title": "t"})
+    until = written.headers.get("x-read-primary-until")
+    cookieless.cookies.clear()
+    via_header = source(cookieless.get("/api/examples", headers={"X-Read-Primary-Until": until or ""}))
+    without_header = source(cookieless.get("/api/examples"))
+    report["read_after_write_via_header"] = {"with_header": via_header, "without": without_header}
+    check(until is not None and via_header == "primary", f"read echoing X-Read-Primary-Until served by {via_header}", failures)
+    check(without_header.startswith("replica"), f"cookieless read without the header served by {without_header}", failures)
+
+    time.sleep(1.1)
+    expired = source(client.get("/api/examples"))
+    report["read_after_sticky_window"] = expired
+    check(expired.startswith("replica"), f"read after the sticky window served by {expired}", failures)
+
+    # Break replica-b: a directory where its database file was
+    shutil.move(paths["replica-b"], paths["replica-b"] + ".bak")
+    os.mkdir(paths["replica-b"])
+    statuses = [client.get("/api/examples").status_code for _ in range(6)]
+    healthy_reads = [source(client.get("/api/examples")) for _ in range(4)]
+    report["failover"] = {"first_statuses": statuses, "then_served_by": healthy_reads}
+    check(statuses.count(200) >= 5, f"more than one failed read before failover: {statuses}", failures)
+    check(set(healthy_reads) == {"replica-a"}, f"broken replica still in rotation: {healthy_reads}", failures)
+
+    os.rmdir(paths["replica-b"])
+    shutil.move(paths["replica-b"] + ".bak", paths["replica-b"])
+    status = asyncio.run(database_prober.probe())
+    recovered = [source(client.get("/api/examples")) for _ in range(4)]
+    report["after_recovery_probe"] = {"replicas": status["replicas"], "served_by": recovered}
+    check("replica-b" in recovered, f"recovered replica not back in rotation: {recovered}", failures)
+
+    latency = {}
+    for label, target in (("replicas", None), ("primary", "sticky")):
+        if target:
+            client.cookies.set("db_read_primary_until", str(time.time() + 3600))
+        else:
+            client.cookies.clear()
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            client.get("/api/examples")
+        latency[f"{label}_mean_ms"] = round((time.perf_counter() - start) / args.requests * 1000, 3)
+    report["list_latency"] = latency
+
+    asyncio.run(read_replicas.dispose())
+    report["failures"] = failures
+    print(json.dumps(report, indent=2, default=str))
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
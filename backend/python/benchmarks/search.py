@@ -0,0 +1,85 @@
+"""
+Name search latency: unindexed ILIKE scan vs trigram-indexed ranked search
+
+For each table size the old query (`name ILIKE '%term%'` over the whole
+table, no limit) runs without the trigram index, then the current ranked
+search (search.search_query + keyset limit) runs with ix_example_name_trgm
+in place. On SQLite only the fallback path is exercised, so run against
+PostgreSQL for meaningful numbers.
+
+Usage:
+    python -m benchmarks.search --sizes 10000 100000 1000000 --repeat 20
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import configure_database, seed_examples, summarize
+
+# Mix of selective and broad terms, including ones shorter than a trigram
+SEARCH_TERMS = ("keynote", "zulu demo", "ote 12", "4242", "ch", "speaker whiskey 9")
+
+CREATE_TRGM_INDEX = "CREATE INDEX IF NOT EXISTS ix_example_name_trgm ON example USING gin (name gin_trgm_ops)"
+DROP_TRGM_INDEX = "DROP INDEX IF EXISTS ix_example_name_trgm"
+
+
+def measure(session, build_query, repeat: int) -> dict:
+    """
+    Run every search term `repeat` times and summarize per-query latency
+    """
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for term in SEARCH_TERMS:
+            start = time.perf_counter()
+            session.execute(build_query(term)).all()
+            latencies.append(time.perf_counter() - start)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to benchmark (default: DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    url = configure_database(args.database_url)
+
+    from sqlalchemy import select, text
+
+    import database
+    from models import Example
+    from pagination import DEFAULT_PAGE_SIZE, paginate
+    from search import search_query
+
+    dialect = database.engine.dialect.name
+    postgres = dialect == "postgresql"
+
+    def old_query(term):
+        return select(Example).where(Example.name.ilike(f"%{term}%")).order_by(Example.entry_date.desc())
+
+    def new_query(term):
+        query, rank = search_query(dialect, term)
+        return paginate(query, DEFAULT_PAGE_SIZE, None, rank=rank)
+
+    report = {"database": url.split("@")[-1], "terms": SEARCH_TERMS, "results": {}}
+    for size in args.sizes:
+        seed_examples(size)
+        with database.SessionLocal() as session:
+            if postgres:
+                session.execute(text(DROP_TRGM_INDEX))
+                session.commit()
+            before = measure(session, old_query, args.repeat)
+            if postgres:
+                session.execute(text(CREATE_TRGM_INDEX))
+                session.commit()
+            after = measure(session, new_query, args.repeat)
+        report["results"][size] = {"ilike_scan": before, "ranked_search": after}
+        print(f"{size} rows: p50 {before['p50_ms']}ms -> {after['p50_ms']}ms", flush=True)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
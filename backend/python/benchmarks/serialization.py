@@ -0,0 +1,100 @@
+"""
+List serialization cost: ORM + response_model validation vs column tuples + orjson
+
+The old path loads `Example` ORM objects, validates them into
+List[ExampleResponse] and JSON-encodes the dumped models, the way FastAPI
+handles `response_model`. The fast path (serialization.encode_examples) loads
+column tuples and encodes them directly. Each path is timed with and without
+the database fetch, and peak allocated memory is measured with tracemalloc.
+The script also checks both paths produce the same JSON.
+
+Usage:
+    python -m benchmarks.serialization --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from typing import List
+
+from benchmarks.common import configure_database, seed_examples
+
+
+def measure(function, repeat: int) -> dict:
+    """
+    Best wall time over `repeat` runs plus peak traced memory of one more run
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "best_ms": round(best * 1000, 2),
+        "peak_alloc_kib": round(peak / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Database to benchmark (default: DATABASE_URL or a temp SQLite file)")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    url = configure_database(args.database_url)
+    seed_examples(args.rows)
+
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+
+    import database
+    from models import Example
+    from pagination import KEYSET_ORDER
+    from schemas import ExampleResponse
+    from serialization import EXAMPLE_COLUMNS, encode_examples
+
+    adapter = TypeAdapter(List[ExampleResponse])
+
+    def encode_models(objects) -> bytes:
+        validated = adapter.validate_python(objects, from_attributes=True)
+        content = adapter.dump_python(validated, mode="json", by_alias=True)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+    session = database.SessionLocal()
+
+    def fetch_models():
+        session.expunge_all()
+        return session.execute(select(Example).order_by(*KEYSET_ORDER)).scalars().all()
+
+    def fetch_tuples():
+        return session.execute(select(*EXAMPLE_COLUMNS).order_by(*KEYSET_ORDER)).all()
+
+    objects = fetch_models()
+    rows = fetch_tuples()
+    if json.loads(encode_models(objects)) != json.loads(encode_examples(rows)):
+        raise SystemExit("Fast path output differs from the response_model path")
+
+    report = {
+        "database": url.split("@")[-1],
+        "rows": args.rows,
+        "encode_only": {
+            "response_model": measure(lambda: encode_models(objects), args.repeat),
+            "fast_path": measure(lambda: encode_examples(rows), args.repeat),
+        },
+        "fetch_and_encode": {
+            "response_model": measure(lambda: encode_models(fetch_models()), args.repeat),
+            "fast_path": measure(lambda: encode_examples(fetch_tuples()), args.repeat),
+        },
+    }
+    session.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Read-through cache for single Example reads
+
+Serialized ExampleResponse payloads are kept in a bounded in-process LRU with
+a TTL, optionally backed by a shared store (Redis, or an in-memory stand-in
+for tests) so several uvicorn workers see each other's invalidations.
+
+Correctness across workers comes from a per-example generation counter in the
+shared store: writers bump it, cached payloads are keyed by the generation
+they were read at, and a fill that raced with a write lands under a stale
+generation that is never read. Without a shared store the local cache is only
+enabled when the app is known to run as a single process
+(CACHE_SINGLE_PROCESS=true, set by server.py), since other workers'
+invalidations would never reach it.
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with per-entry TTL and hit/miss counters
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[object, Tuple[float, bytes]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class InMemoryBackend:
+    """
+    Shared-store stand-in with the subset of Redis semantics the cache uses
+
+    One instance shared by several ExampleCache objects behaves like several
+    workers talking to the same Redis, which is how benchmarks.cache checks
+    invalidation and the fill/write race without a Redis server.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[Optional[float], bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._values[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds else None
+        self._values[key] = (expires_at, value)
+
+    async def incr(self, key: str, ttl_seconds: Optional[float] = None) -> int:
+        value = int(await self.get(key) or 0) + 1
+        await self.set(key, str(value).encode(), ttl_seconds)
+        return value
+
+
+class RedisBackend:
+    """
+    Shared store backed by Redis (requires the optional `redis` package)
+    """
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_SHARED_URL points at Redis but the 'redis' package is not installed")
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None:
+        await self._client.set(key, value, px=int(ttl_seconds * 1000) if ttl_seconds else None)
+
+    async def incr(self, key: str, ttl_seconds: Optional[float] = None) -> int:
+        if not ttl_seconds:
+            return await self._client.incr(key)
+        async with self._client.pipeline(transaction=True) as pipeline:
+            value, _ = await pipeline.incr(key).pexpire(key, int(ttl_seconds * 1000)).execute()
+        return value
+
+
+def create_backend(url: Optional[str]):
+    """
+    Build the shared backend for CACHE_SHARED_URL (memory:// or redis://), if any
+    """
+    if not url:
+        return None
+    if url.startswith("memory://"):
+        return InMemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported CACHE_SHARED_URL scheme: {url}")
+
+
+class ExampleCache:
+    """
+    Read-through cache of serialized examples with precise per-ID invalidation
+
+    Usage from a handler:
+        cached, token = await cache.lookup(id)
+        ... on miss, load and serialize the row ...
+        await cache.fill(id, token, payload)
+    and after a committed write:
+        await cache.invalidate([id])
+    """
+
+    def __init__(self, local: Optional[LRUCache], shared=None, ttl_seconds: float = 30.0):
+        self.local = local
+        self.shared = shared
+        self.ttl_seconds = ttl_seconds
+        # Generation counters must outlive every payload keyed by them: one
+        # that expired would restart at 0 and could make old payloads reachable
+        self.generation_ttl_seconds = max(ttl_seconds * 10, 3600.0)
+        self.shared_hits = 0
+        self.invalidations = 0
+        self.errors = 0
+        # Local-only mode: any write invalidates fills that were in flight
+        self._write_counter = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.local is not None or self.shared is not None
+
+    async def _generation(self, id: int) -> int:
+        if self.shared is None:
+            return self._write_counter
+        return int(await self.shared.get(f"example:{id}:gen") or 0)
+
+    async def lookup(self, id: int) -> Tuple[Optional[bytes], Optional[int]]:
+        """
+        Return (payload or None, token); pass the token to fill() after a miss
+
+        A failing shared store is treated as a miss with no token, so reads
+        fall through to the database instead of erroring.
+        """
+        if not self.enabled:
+            return None, None
+
+        try:
+            generation = await self._generation(id)
+            local_key = (id, generation) if self.shared is not None else id
+            if self.local is not None:
+                value = self.local.get(local_key)
+                if value is not None:
+                    return value, generation
+
+            if self.shared is not None:
+                value = await self.shared.get(f"example:{id}:v{generation}")
+                if value is not None:
+                    self.shared_hits += 1
+                    if self.local is not None:
+                        self.local.set(local_key, value)
+                    return value, generation
+        except Exception:
+            self.errors += 1
+            return None, None
+
+        return None, generation
+
+    async def fill(self, id: int, token: Optional[int], payload: bytes) -> None:
+        """
+        Store a payload loaded after lookup() returned `token`
+        """
+        if not self.enabled or token is None:
+            return
+        if self.shared is None:
+            if token == self._write_counter and self.local is not None:
+                self.local.set(id, payload)
+            return
+
+        # Keyed by the generation seen before the read: if a write bumped it
+        # meanwhile, this entry is unreachable and simply expires
+        try:
+            await self.shared.set(f"example:{id}:v{token}", payload, self.ttl_seconds)
+        except Exception:
+            self.errors += 1
+            return
+        if self.local is not None:
+            self.local.set((id, token), payload)
+
+    async def invalidate(self, ids: Iterable[int]) -> None:
+        """
+        Drop cached payloads for examples changed by a committed write
+
+        Shared-store failures are counted rather than raised (the write has
+        already committed); affected entries then age out after the TTL.
+        """
+        if not self.enabled:
+            return
+        for id in ids:
+            self.invalidations += 1
+            if self.shared is None:
+                self._write_counter += 1
+                if self.local is not None:
+                    self.local.delete(id)
+                continue
+            try:
+                await self.shared.incr(f"example:{id}:gen", self.generation_ttl_seconds)
+            except Exception:
+                self.errors += 1
+
+    def stats(self) -> dict:
+        """
+        Counters for monitoring cache effectiveness
+        """
+        local = self.local
+        return {
+            "enabled": self.enabled,
+            "shared_backend": type(self.shared).__name__ if self.shared is not None else None,
+            "local_entries": len(local) if local is not None else 0,
+            "local_max_entries": local.max_entries if local is not None else 0,
+            "hits": local.hits if local is not None else 0,
+            "shared_hits": self.shared_hits,
+            "misses": local.misses if local is not None else 0,
+            "evictions": local.evictions if local is not None else 0,
+            "expirations": local.expirations if local is not None else 0,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+        }
+
+
+def create_example_cache() -> ExampleCache:
+    """
+    Build the process-wide example cache from environment variables
+
+    CACHE_ENABLED (default true), CACHE_MAX_ENTRIES (default 1024),
+    CACHE_TTL_SECONDS (default 30), CACHE_SHARED_URL (memory:// or redis://...),
+    CACHE_SINGLE_PROCESS (default false). Without a shared backend the local
+    LRU is only used when CACHE_SINGLE_PROCESS asserts there are no other
+    workers: a worker count can't be told from inside the process (e.g.
+    `uvicorn --workers 4` doesn't set WEB_CONCURRENCY), so it defaults to off.
+    """
+    if os.getenv("CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return ExampleCache(local=None)
+
+    ttl_seconds = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+    shared = create_backend(os.getenv("CACHE_SHARED_URL"))
+    single_process = os.getenv("CACHE_SINGLE_PROCESS", "false").lower() in ("1", "true", "yes")
+    local = None
+    if shared is not None or single_process:
+        local = LRUCache(int(os.getenv("CACHE_MAX_ENTRIES", "1024")), ttl_seconds)
+    return ExampleCache(local=local, shared=shared, ttl_seconds=ttl_seconds)
@@ -0,0 +1,337 @@
+"""
+Real-time change feed for examples (Server-Sent Events)
+
+Every write handler publishes its changes right before commit with
+publish_changes(). On PostgreSQL the events go out through
+`pg_notify('example_changes', ...)` inside the write's transaction, so they
+are delivered exactly when (and only if) the write commits, to every worker.
+Each worker holds ONE dedicated asyncpg connection that LISTENs on the
+channel and fans events out to its SSE clients in memory; client
+connections never hold database connections. Other databases (SQLite for
+local runs and tests) fall back to delivering events in-process after the
+session commits.
+
+Event IDs are "<write generation>-<index>", using the generation that
+bump_version returns in the write's transaction (see versioning.py), so
+they are unique but not necessarily in commit order. Events reach every
+worker in commit order, though (PostgreSQL delivers notifications in the
+order their transactions committed), so each worker keeps the last
+STREAM_REPLAY_EVENTS events in arrival order: a client reconnecting with
+`Last-Event-ID` gets the events after that one, or a `reset` event (refetch
+the list) when it is no longer known.
+
+Backpressure: each client has a bounded queue of STREAM_QUEUE_SIZE events.
+The listener never waits for a slow client; when its queue is full the
+client's stream is ended after the queued events, and the browser's
+EventSource reconnects with its Last-Event-ID and catches up from the
+replay buffer.
+"""
+import asyncio
+import itertools
+import json
+import os
+import signal
+import threading
+from collections import deque
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import ARRAY, Text, bindparam, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import ASYNC_DATABASE_URL
+from schemas import ExampleResponse
+
+CHANNEL = "example_changes"
+
+# Session.info key holding events to deliver in-process after commit (non-PostgreSQL)
+PENDING_KEY = "changefeed_pending"
+
+# Reconnect delay of the LISTEN connection after it fails or is lost
+LISTEN_RETRY_SECONDS = 5.0
+
+# Reconnect delay advertised to EventSource clients (SSE `retry:` field)
+CLIENT_RETRY_MS = 3000
+
+
+def parse_event_id(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    "<generation>-<index>" as a comparable tuple (None if absent or malformed)
+    """
+    if not value:
+        return None
+    generation, _, index = value.strip().partition("-")
+    try:
+        return int(generation), int(index)
+    except ValueError:
+        return None
+
+
+def sse_frame(event_type: str, data: str, event_id: Optional[str] = None) -> bytes:
+    """
+    One Server-Sent Events message (data is single-line JSON)
+    """
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event_type}\ndata: {data}\n\n".encode()
+
+
+class Subscription:
+    """
+    One SSE client: a bounded queue of encoded frames
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue: "asyncio.Queue[bytes]" = asyncio.Queue(maxsize=queue_size)
+        # Set when an event had to be dropped; the stream ends once the queue drains
+        self.overflowed = False
+        # Set when the feed can no longer guarantee continuity (listener reconnect, shutdown)
+        self.closed = False
+
+    def deliver(self, frame: bytes) -> None:
+        if self.overflowed or self.closed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def close(self) -> None:
+        self.closed = True
+        # Wake a waiting reader; an empty frame is never sent
+        try:
+            self.queue.put_nowait(b"")
+        except asyncio.QueueFull:
+            pass
+
+
+class ChangeFeed:
+    """
+    Per-worker fan-out of change events to SSE subscriptions, with a replay buffer
+    """
+
+    def __init__(self, replay_size: int = 1000, queue_size: int = 256, heartbeat_seconds: float = 15.0):
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.subscriptions: Set[Subscription] = set()
+        # (event ID, frame) in arrival (= commit) order
+        self._buffer: "deque[Tuple[str, bytes]]" = deque(maxlen=replay_size)
+        self._listener: Optional[asyncio.Task] = None
+        # Set once the server is shutting down: streams end, new ones end at once
+        self._closing = False
+
+    def dispatch(self, payload: str) -> None:
+        """
+        Buffer one published event and fan it out (payload as sent by publish_changes)
+        """
+        message = json.loads(payload)
+        if parse_event_id(message["id"]) is None:
+            return
+        frame = sse_frame(message["type"], json.dumps(message["data"], separators=(",", ":")), message["id"])
+        self._buffer.append((message["id"], frame))
+        for subscription in self.subscriptions:
+            subscription.deliver(frame)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Register a client; with a Last-Event-ID its queue starts with the missed events (or a reset)
+        """
+        subscription = Subscription(self.queue_size)
+        if self._closing:
+            subscription.close()
+            return subscription
+        if parse_event_id(last_event_id) is not None:
+            last_event_id = last_event_id.strip()
+            missed = None
+            for index, (event_id, _) in enumerate(self._buffer):
+                if event_id == last_event_id:
+                    missed = [frame for _, frame in itertools.islice(self._buffer, index + 1, None)]
+                    break
+            # Not buffered: older than the buffer, or from before a gap in this worker's feed
+            if missed is None:
+                subscription.deliver(sse_frame("reset", json.dumps({"reason": "events since Last-Event-ID are unavailable"}, separators=(",", ":"))))
+            elif len(missed) >= self.queue_size:
+                subscription.deliver(sse_frame("reset", json.dumps({"reason": "too many missed events"}, separators=(",", ":"))))
+            else:
+                for frame in missed:
+                    subscription.deliver(frame)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    def interrupt(self) -> None:
+        """
+        Mark a possible gap and end every stream, so clients reconnect and resync
+        """
+        # Events on either side of the gap can no longer be replayed as one sequence
+        self._buffer.clear()
+        for subscription in list(self.subscriptions):
+            subscription.close()
+
+    async def stream(self, subscription: Subscription):
+        """
+        SSE body for one subscription, with heartbeats so idle proxies keep it open
+        """
+        try:
+            yield f"retry: {CLIENT_RETRY_MS}\n\n".encode()
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscription.queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if frame:
+                    yield frame
+                if subscription.closed or (subscription.overflowed and subscription.queue.empty()):
+                    return
+        finally:
+            self.unsubscribe(subscription)
+
+    async def _listen(self, dsn: str) -> None:
+        """
+        Hold the worker's LISTEN connection, reconnecting after failures
+        """
+        import asyncpg
+
+        connected_before = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(CHANNEL, lambda _conn, _pid, _channel, payload: self.dispatch(payload))
+                if connected_before:
+                    # Events committed while disconnected were never received
+                    self.interrupt()
+                connected_before = True
+                await lost.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            self.interrupt()
+            await asyncio.sleep(LISTEN_RETRY_SECONDS)
+
+    def close_streams(self) -> None:
+        """
+        End every stream now and any opened from here on (server shutting down)
+        """
+        self._closing = True
+        self.interrupt()
+
+    def close_streams_on_exit_signals(self) -> None:
+        """
+        Call close_streams as soon as the server receives SIGINT/SIGTERM
+
+        Uvicorn drains in-flight requests before it runs the lifespan
+        shutdown, and a stream never finishes on its own, so waiting for
+        stop() would hold every shutdown for the whole drain timeout and then
+        cut the streams off mid-response. This chains onto the handlers the
+        server installed (uvicorn's); without them, or outside the main
+        thread, the signals are left alone.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous = signal.getsignal(signum)
+            if not callable(previous):
+                continue
+
+            def handler(signum, frame, previous=previous):
+                loop.call_soon_threadsafe(self.close_streams)
+                previous(signum, frame)
+
+            signal.signal(signum, handler)
+
+    def start(self) -> None:
+        """
+        Start the LISTEN task when the database is PostgreSQL (idempotent)
+        """
+        self._closing = False
+        if ASYNC_DATABASE_URL is None or (self._listener is not None and not self._listener.done()):
+            return
+        url = make_url(ASYNC_DATABASE_URL)
+        if url.get_backend_name() != "postgresql":
+            return
+        dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._listener = asyncio.create_task(self._listen(dsn), name="changefeed-listener")
+
+    async def stop(self) -> None:
+        """
+        End all streams and close the LISTEN connection
+        """
+        self.interrupt()
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+def example_events(examples: Iterable) -> List[dict]:
+    """
+    Event data for created/updated Example rows: the same JSON as GET /api/examples/{id}
+    """
+    return [ExampleResponse.model_validate(example).model_dump(mode="json", by_alias=True) for example in examples]
+
+
+def event_payloads(generation: int, event_type: str, items: Iterable[dict]) -> List[str]:
+    return [
+        json.dumps({"id": f"{generation}-{index}", "type": event_type, "data": data}, separators=(",", ":"), default=str)
+        for index, data in enumerate(items)
+    ]
+
+
+async def publish_changes(db: AsyncSession, generation: int, event_type: str, items: Iterable[dict]) -> None:
+    """
+    Publish change events as part of the caller's transaction (call right before commit)
+
+    `event_type` is "created", "updated" or "deleted"; `items` are the example
+    representations (just {"id": ...} for deletes). `generation` is the value
+    returned by bump_version in the same transaction.
+    """
+    payloads = event_payloads(generation, event_type, items)
+    if not payloads:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        statement = text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload").bindparams(
+            bindparam("payloads", type_=ARRAY(Text)),
+        )
+        await db.execute(statement, {"channel": CHANNEL, "payloads": payloads})
+    else:
+        db.info.setdefault(PENDING_KEY, []).extend(payloads)
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_pending(session) -> None:
+    for payload in session.info.pop(PENDING_KEY, ()):
+        change_feed.dispatch(payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session) -> None:
+    session.info.pop(PENDING_KEY, None)
+
+
+def create_change_feed() -> ChangeFeed:
+    """
+    Build the worker's change feed from STREAM_* environment variables
+    """
+    return ChangeFeed(
+        replay_size=int(os.getenv("STREAM_REPLAY_EVENTS", "1000")),
+        queue_size=int(os.getenv("STREAM_QUEUE_SIZE", "256")),
+        heartbeat_seconds=float(os.getenv("STREAM_HEARTBEAT_SECONDS", "15")),
+    )
+
+
+# Shared by the write handlers (publish) and the stream endpoint (subscribe)
+change_feed = create_change_feed()
@@ -0,0 +1,156 @@
+"""
+Circuit breaker for the primary database
+
+When the database is down or stalled, each request would otherwise wait out
+a connect or statement timeout before failing. The breaker counts
+consecutive connection failures (refused or timed-out connects, dropped
+connections, statement timeouts) seen by the engine. After
+DB_CIRCUIT_FAILURE_THRESHOLD of them it opens, and the session dependencies
+answer 503 immediately without touching the pool.
+
+After DB_CIRCUIT_RESET_SECONDS the breaker half-opens and lets a single
+request through as a probe (the background health prober's SELECT 1 acts as
+one too). Any statement that completes closes it again; a failure reopens it
+for another DB_CIRCUIT_RESET_SECONDS.
+
+Failures and successes are observed through engine events, so SQL errors
+(constraint violations, bad input) never count against the database.
+"""
+import os
+import time
+from typing import Optional
+
+from sqlalchemy import event
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """
+    The database circuit is open; retry after `retry_after` seconds
+    """
+
+    def __init__(self, retry_after: float, last_error: Optional[str]):
+        super().__init__(f"Database unavailable (circuit open after repeated connection failures: {last_error})")
+        self.retry_after = retry_after
+        self.last_error = last_error
+
+
+def is_connection_failure(error: BaseException) -> bool:
+    """
+    Whether an error means the database is unreachable or not answering (not a SQL error)
+    """
+    if isinstance(error, (OSError, TimeoutError)):
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in (
+        "connection", "refused", "could not connect", "timeout", "timed out", "statement timeout",
+    ))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker fed by engine events
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+
+    def check(self) -> None:
+        """
+        Let a request use the database, or raise CircuitOpenError
+
+        In the half-open state one request at a time is let through as a
+        probe; a probe that hasn't finished within reset_seconds is replaced.
+        """
+        if self.state == CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == OPEN and now - self._opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+            self._probe_started_at = None
+        if self.state == HALF_OPEN and (
+            self._probe_started_at is None or now - self._probe_started_at >= self.reset_seconds
+        ):
+            self._probe_started_at = now
+            return
+        raise CircuitOpenError(self.retry_after(), self.last_error)
+
+    def retry_after(self) -> float:
+        if self.state == OPEN:
+            return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+        return self.reset_seconds if self.state == HALF_OPEN else 0.0
+
+    def record_success(self) -> None:
+        if self.state != CLOSED or self.failures:
+            self.state = CLOSED
+            self.failures = 0
+            self._probe_started_at = None
+
+    def record_failure(self, error: BaseException) -> None:
+        if self.failure_threshold <= 0:
+            return
+        self.failures += 1
+        self.last_error = str(error) or type(error).__name__
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+            self._probe_started_at = None
+
+    def status(self) -> dict:
+        """
+        State for /api/health/db
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_after_seconds": round(self.retry_after(), 2) if self.state != CLOSED else None,
+            "last_error": self.last_error if self.state != CLOSED else None,
+        }
+
+    def attach(self, engine) -> None:
+        """
+        Feed the breaker from a (sync) engine's connect, execute and error events
+        """
+        breaker = self
+
+        @event.listens_for(engine, "do_connect")
+        def do_connect(dialect, connection_record, cargs, cparams):
+            # Connect errors (refused, timed out) don't reach handle_error for every driver
+            try:
+                return dialect.connect(*cargs, **cparams)
+            except Exception as e:
+                breaker.record_failure(e)
+                raise
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            breaker.record_success()
+
+        @event.listens_for(engine, "handle_error")
+        def handle_error(context):
+            error = context.original_exception
+            # Connect failures (no connection yet) were counted by do_connect
+            if context.connection is None:
+                return
+            if context.is_disconnect or is_connection_failure(error):
+                breaker.record_failure(error)
+
+
+def create_circuit_breaker() -> CircuitBreaker:
+    """
+    Build the breaker from DB_CIRCUIT_* environment variables (threshold 0 disables it)
+    """
+    return CircuitBreaker(
+        failure_threshold=int(os.getenv("DB_CIRCUIT_FAILURE_THRESHOLD", "5")),
+        reset_seconds=float(os.getenv("DB_CIRCUIT_RESET_SECONDS", "10")),
+    )
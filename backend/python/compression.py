@@ -0,0 +1,282 @@
+"""
+Negotiated gzip/brotli response compression
+
+CompressionMiddleware compresses text-like responses (JSON, NDJSON, CSV,
+YAML, ...) of at least COMPRESSION_MIN_SIZE bytes with the best encoding the
+client accepts: brotli when the optional `brotli` package is installed, else
+gzip. Streaming responses (exports) are compressed chunk by chunk and flushed
+after every chunk, so rows keep arriving progressively.
+
+Responses carrying a strong ETag are deterministic for that ETag on a given
+URL (list ETags encode the table generation and the URL, by-id ETags only the
+row version, which other rows share), so their compressed bytes are kept in a
+small LRU keyed by ETag, path and query string, and reused while nothing has
+been written. Responses that already have a
+Content-Encoding (the precomputed OpenAPI documents) pass through untouched.
+
+Each encoding is a distinct representation, so its ETag gets a suffix
+("...-gzip", "...-br"); versioning.etag_matches ignores the suffix when
+answering If-None-Match.
+"""
+import gzip
+import os
+import zlib
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from cache import LRUCache
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Encodings this process can produce, in order of preference for equal q-values
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# ETag suffix per encoding
+ETAG_SUFFIXES = {"br": "-br", "gzip": "-gzip"}
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "application/yaml",
+    "text/",
+)
+
+
+def negotiate_encoding(accept_encoding: str, supported=SUPPORTED_ENCODINGS) -> Optional[str]:
+    """
+    Pick the supported content-coding with the highest q-value (None means identity)
+
+    Ties go to the earlier entry of `supported`; "*" covers codings not listed explicitly.
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[name] = q
+
+    wildcard = qualities.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in supported:
+        q = qualities.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    """
+    Compress a complete body (gzip with mtime=0 so equal input gives equal bytes)
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class StreamCompressor:
+    """
+    Incremental compressor flushing after every chunk
+    """
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    ETag of the `encoding` representation: '"v-abc"' -> '"v-abc-gzip"'
+    """
+    return etag[:-1] + ETAG_SUFFIXES[encoding] + '"' if etag.endswith('"') else etag
+
+
+def strip_encoding_suffix(etag: str) -> str:
+    """
+    Inverse of encoded_etag, for If-None-Match comparison
+    """
+    for suffix in ETAG_SUFFIXES.values():
+        if etag.endswith(suffix + '"'):
+            return etag[:-len(suffix) - 1] + '"'
+    return etag
+
+
+def is_compressible(headers: Headers, status: int) -> bool:
+    if status < 200 or status in (204, 206, 304) or "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware applying negotiated gzip/brotli compression
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, levels: Optional[Dict[str, int]] = None,
+                 cache: Optional[LRUCache] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": 6, "br": 4, **(levels or {})}
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        target = scope["path"] + "?" + scope["query_string"].decode("latin-1")
+        responder = CompressingResponder(self, send, encoding, request_headers.get("if-none-match", ""), target)
+        await self.app(scope, receive, responder.send)
+
+    def compressed(self, body: bytes, encoding: str, etag: Optional[str], target: str = "") -> bytes:
+        """
+        Compress a complete body, reusing cached bytes for strong-ETag responses
+
+        `target` is the request path and query string: an ETag only identifies
+        a representation of one URL (by-id ETags are just the row version).
+        """
+        if self.cache is None or not etag or etag.startswith("W/"):
+            return compress(body, encoding, self.levels[encoding])
+        key: Tuple = (target, etag, encoding, len(body), zlib.crc32(body))
+        payload = self.cache.get(key)
+        if payload is None:
+            payload = compress(body, encoding, self.levels[encoding])
+            self.cache.set(key, payload)
+        return payload
+
+
+class CompressingResponder:
+    """
+    Per-request send() wrapper: holds the start message until the first body chunk decides the mode
+    """
+
+    def __init__(self, middleware: CompressionMiddleware, send, encoding: str, if_none_match: str, target: str):
+        self.middleware = middleware
+        self._send = send
+        self.encoding = encoding
+        self.if_none_match = if_none_match
+        self.target = target
+        self.start_message = None
+        self.mode = None  # "identity", "whole" or "stream", decided on the first body chunk
+        self.stream: Optional[StreamCompressor] = None
+
+    def encoded_headers(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+        return headers
+
+    def revalidated(self, message):
+        """
+        A 304 confirms the representation the client holds: echo its encoded ETag if that's what it sent
+        """
+        headers = MutableHeaders(raw=message["headers"])
+        etag = headers.get("etag")
+        if etag and encoded_etag(etag, self.encoding) in self.if_none_match:
+            headers["ETag"] = encoded_etag(etag, self.encoding)
+            headers.add_vary_header("Accept-Encoding")
+        return message
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            if message["status"] == 304:
+                await self._send(self.revalidated(message))
+                self.mode = "identity"
+                return
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.mode is None:
+            headers = Headers(raw=self.start_message["headers"])
+            etag = headers.get("etag")
+            if not is_compressible(headers, self.start_message["status"]):
+                self.mode = "identity"
+            elif not more_body:
+                self.mode = "whole" if len(body) >= self.middleware.minimum_size else "identity"
+            else:
+                self.mode = "stream"
+
+            if self.mode == "identity":
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            encoded = self.encoded_headers()
+            if self.mode == "whole":
+                payload = self.middleware.compressed(body, self.encoding, etag, self.target)
+                encoded["Content-Length"] = str(len(payload))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": payload})
+                return
+
+            del encoded["Content-Length"]
+            self.stream = StreamCompressor(self.encoding, self.middleware.levels[self.encoding])
+            await self._send(self.start_message)
+
+        if self.mode == "identity":
+            await self._send(message)
+            return
+
+        payload = self.stream.chunk(body) if body else b""
+        if not more_body:
+            payload += self.stream.finish()
+        await self._send({"type": "http.response.body", "body": payload, "more_body": more_body})
+
+
+def compression_enabled() -> bool:
+    return os.getenv("COMPRESSION_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def compression_options() -> dict:
+    """
+    CompressionMiddleware keyword arguments from environment variables
+    """
+    entries = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256"))
+    return {
+        "minimum_size": int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+        "levels": {
+            "gzip": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+            "br": int(os.getenv("COMPRESSION_BROTLI_LEVEL", "4")),
+        },
+        "cache": LRUCache(entries, float(os.getenv("COMPRESSION_CACHE_TTL_SECONDS", "300"))) if entries > 0 else None,
+    }
@@ -0,0 +1,222 @@
+"""
+Write helpers shared by the single-row and bulk Example endpoints
+
+The value normalization here is the one place that decides how a DTO maps to
+column values, so `POST /api/examples` and `POST /api/examples/bulk` (and the
+update pair) accept and reject exactly the same input.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+from pydantic import ValidationError
+from sqlalchemy import Boolean, Integer, String, any_, bindparam, case, cast, column, delete, func, insert, select, true, update, values
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Example
+from schemas import CreateExampleDto, UpdateExampleDto
+
+# Upper bound on items accepted by a single bulk request
+MAX_BULK_ITEMS = 1000
+
+
+def create_values(data: CreateExampleDto) -> Dict[str, Any]:
+    """
+    Column values for a new example
+
+    Raises:
+        ValueError: if a required field is blank
+    """
+    if not data.name or not data.name.strip():
+        raise ValueError("Name is required")
+    if not data.title or not data.title.strip():
+        raise ValueError("Title is required")
+
+    return {
+        "name": data.name.strip(),
+        "title": data.title.strip(),
+        "description": data.description.strip() if data.description else None,
+        "is_active": data.isActive if data.isActive is not None else True,
+    }
+
+
+def update_values(data: UpdateExampleDto) -> Dict[str, Any]:
+    """
+    Column values changed by a partial update (fields left as None are omitted)
+
+    Raises:
+        ValueError: if name or title is provided but blank
+    """
+    changes = {}
+    if data.name is not None:
+        if not data.name.strip():
+            raise ValueError("Name cannot be empty")
+        changes["name"] = data.name.strip()
+
+    if data.title is not None:
+        if not data.title.strip():
+            raise ValueError("Title cannot be empty")
+        changes["title"] = data.title.strip()
+
+    if data.description is not None:
+        changes["description"] = data.description.strip() if data.description.strip() else None
+
+    if data.isActive is not None:
+        changes["is_active"] = data.isActive
+
+    return changes
+
+
+def validation_message(error: ValidationError) -> str:
+    """
+    Flatten a pydantic ValidationError into a single readable message
+    """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" if item["loc"] else item["msg"]
+        for item in error.errors()
+    )
+
+
+async def insert_many(db: AsyncSession, rows: List[Dict[str, Any]]) -> List[Example]:
+    """
+    Insert rows with one multi-row INSERT ... RETURNING, results in input order
+    """
+    if not rows:
+        return []
+    statement = insert(Example).returning(Example, sort_by_parameter_order=True)
+    result = await db.execute(statement, rows)
+    return list(result.scalars().all())
+
+
+def version_condition(versions: Optional[Sequence[int]]):
+    """
+    WHERE clause for an If-Match precondition (None: any version)
+    """
+    return Example.version.in_(list(versions)) if versions is not None else true()
+
+
+async def update_one(
+    db: AsyncSession, id: int, changes: Dict[str, Any], versions: Optional[Sequence[int]] = None,
+) -> Optional[Example]:
+    """
+    Apply a partial update with one UPDATE ... RETURNING and return the updated row
+
+    The row version is incremented. With `versions` (from If-Match) the row is
+    only updated at one of those versions. Returns None when no row matched:
+    the example doesn't exist or is at another version.
+    """
+    statement = (
+        update(Example)
+        .where(Example.id == id, version_condition(versions))
+        .values(**changes, version=Example.version + 1)
+        .returning(Example)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(statement)
+    return result.scalars().first()
+
+
+async def delete_one(db: AsyncSession, id: int, versions: Optional[Sequence[int]] = None) -> bool:
+    """
+    Delete a row with one DELETE ... RETURNING id; False when no row matched (see update_one)
+    """
+    statement = (
+        delete(Example)
+        .where(Example.id == id, version_condition(versions))
+        .returning(Example.id)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(statement)
+    return result.scalar() is not None
+
+
+async def update_many(db: AsyncSession, changes: Dict[int, Dict[str, Any]]) -> Dict[int, Example]:
+    """
+    Apply per-id partial updates and return the updated rows keyed by id
+
+    On PostgreSQL this is a single UPDATE ... FROM (VALUES ...) RETURNING where
+    NULL means "leave unchanged" (description carries an explicit flag since
+    clearing it is a valid change). Other databases fall back to an ORM bulk
+    update by primary key followed by one SELECT.
+
+    Items without any field change are not written on either backend (their
+    version stays the same); existing ones are returned as they are.
+    """
+    if not changes:
+        return {}
+    changed = {id: row for id, row in changes.items() if row}
+
+    if db.get_bind().dialect.name == "postgresql":
+        updated = {}
+        if changed:
+            data = values(
+                column("id", Integer),
+                column("name", String),
+                column("title", String),
+                column("description", String),
+                column("set_description", Boolean),
+                column("is_active", Boolean),
+                name="changes",
+            ).data([
+                (
+                    id,
+                    row.get("name"),
+                    row.get("title"),
+                    row.get("description"),
+                    "description" in row,
+                    row.get("is_active"),
+                )
+                for id, row in changed.items()
+            ])
+            statement = (
+                update(Example)
+                .where(Example.id == data.c.id)
+                .values(
+                    name=func.coalesce(data.c.name, Example.name),
+                    title=func.coalesce(data.c.title, Example.title),
+                    description=case((data.c.set_description, data.c.description), else_=Example.description),
+                    # Cast because a VALUES column that is NULL in every row is typed as text
+                    is_active=func.coalesce(cast(data.c.is_active, Boolean), Example.is_active),
+                    version=Example.version + 1,
+                )
+                .returning(Example)
+                .execution_options(synchronize_session=False)
+            )
+            result = await db.execute(statement)
+            updated = {example.id: example for example in result.scalars().all()}
+        unchanged = [id for id in changes if id not in changed]
+        if unchanged:
+            result = await db.execute(select(Example).where(Example.id.in_(unchanged)))
+            updated.update((example.id, example) for example in result.scalars().all())
+        return updated
+
+    rows = []
+    if changed:
+        existing = set((await db.execute(select(Example.id).where(Example.id.in_(list(changed))))).scalars())
+        rows = [{"id": id, **row} for id, row in changed.items() if id in existing]
+    if rows:
+        await db.execute(update(Example), rows)
+        await db.execute(
+            update(Example)
+            .where(Example.id.in_([row["id"] for row in rows]))
+            .values(version=Example.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+    result = await db.execute(
+        select(Example).where(Example.id.in_(list(changes))).execution_options(populate_existing=True)
+    )
+    return {example.id: example for example in result.scalars().all()}
+
+
+async def delete_many(db: AsyncSession, ids: Sequence[int]) -> List[int]:
+    """
+    Delete rows with one DELETE ... RETURNING id and return the ids that existed
+    """
+    if not ids:
+        return []
+    if db.get_bind().dialect.name == "postgresql":
+        condition = Example.id == any_(bindparam("ids", list(ids), type_=postgresql.ARRAY(Integer)))
+    else:
+        condition = Example.id.in_(list(ids))
+    statement = delete(Example).where(condition).returning(Example.id).execution_options(synchronize_session=False)
+    result = await db.execute(statement)
+    return list(result.scalars().all())
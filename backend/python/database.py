@@ -1,12 +1,20 @@
 """
 Database configuration and connection management using SQLAlchemy
 """
-from sqlalchemy import create_engine, text
+import asyncio
+import threading
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import functions
 import os
 from dotenv import load_dotenv
+from circuit_breaker import create_circuit_breaker
+from metrics import instrument_engine, metrics_enabled
 
 # Load environment variables
 load_dotenv()
@@ -14,24 +22,205 @@ load_dotenv()
 # Get database URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Create SQLAlchemy engine
-# If DATABASE_URL is not set, create a None engine (for optional DB)
-if DATABASE_URL:
-    engine = create_engine(
-        DATABASE_URL,
-        pool_pre_ping=True,  # Verify connections before using them
-        pool_recycle=3600,   # Recycle connections after 1 hour
-    )
-else:
-    engine = None
+# Timeouts in seconds (0 disables one), so a degraded database fails requests
+# quickly instead of tying up workers: establishing a connection, running one
+# statement (server-side statement_timeout), and waiting for a pooled connection
+CONNECT_TIMEOUT_SECONDS = float(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "5"))
+STATEMENT_TIMEOUT_SECONDS = float(os.getenv("DB_STATEMENT_TIMEOUT_SECONDS", "10"))
+POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "5"))
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) if engine else None
+# Per-route override for the bulk endpoints (up to 1000 rows per statement)
+BULK_STATEMENT_TIMEOUT_SECONDS = float(os.getenv("DB_BULK_STATEMENT_TIMEOUT_SECONDS", "30"))
+
+# Session.info key holding a per-session statement timeout (see get_async_db_with_statement_timeout)
+STATEMENT_TIMEOUT_KEY = "statement_timeout_seconds"
+
+
+def engine_options(url: str) -> dict:
+    """
+    create_engine/create_async_engine keyword arguments for a database URL
+
+    Connection health checks and recycling everywhere, plus the timeouts above
+    on PostgreSQL (asyncpg and psycopg2). asyncpg additionally gets a
+    client-side command_timeout a little above the longest statement timeout,
+    which catches a server that stops answering altogether.
+    """
+    options = {
+        "pool_pre_ping": True,  # Verify connections before using them
+        "pool_recycle": 3600,   # Recycle connections after 1 hour
+    }
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        return options
+    if POOL_TIMEOUT_SECONDS:
+        options["pool_timeout"] = POOL_TIMEOUT_SECONDS
+    statement_timeout_ms = str(int(STATEMENT_TIMEOUT_SECONDS * 1000))
+    connect_args = {}
+    if parsed.get_driver_name() == "asyncpg":
+        if CONNECT_TIMEOUT_SECONDS:
+            connect_args["timeout"] = CONNECT_TIMEOUT_SECONDS
+        if STATEMENT_TIMEOUT_SECONDS:
+            connect_args["server_settings"] = {"statement_timeout": statement_timeout_ms}
+            connect_args["command_timeout"] = max(STATEMENT_TIMEOUT_SECONDS, BULK_STATEMENT_TIMEOUT_SECONDS) + 5
+    elif parsed.get_driver_name() == "psycopg2":
+        if CONNECT_TIMEOUT_SECONDS:
+            # libpq takes whole seconds, minimum 2
+            connect_args["connect_timeout"] = max(2, int(CONNECT_TIMEOUT_SECONDS + 0.5))
+        if STATEMENT_TIMEOUT_SECONDS:
+            connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+# Async drivers used for each sync dialect when ASYNC_DATABASE_URL is not set
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Derive an async driver URL from a sync DATABASE_URL
+
+    postgresql://... becomes postgresql+asyncpg://... and sqlite://... becomes
+    sqlite+aiosqlite://..., URLs that already name an async driver are kept.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for database backend '{backend}'")
+    if parsed.get_driver_name() in ("asyncpg", "aiosqlite", "psycopg_async"):
+        return url
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+# Async engine used by the API handlers so queries don't block the event loop.
+# The sync engine stays available for Alembic and scripts.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or (to_async_url(DATABASE_URL) if DATABASE_URL else None)
+
+# Fails requests fast while the primary keeps refusing or timing out (see circuit_breaker.py)
+database_breaker = create_circuit_breaker()
+
+# Engines and session factories, created on first use so that importing this
+# module (the app, Alembic's env.py, scripts) loads no database driver and
+# opens no pool. The API's async engine is first used by the health prober
+# started in the app lifespan; the sync engine only by Alembic and scripts.
+_lazy_objects: dict = {}
+_lazy_lock = threading.RLock()
+_MISSING = object()
+
+
+def _lazy(name: str, factory):
+    value = _lazy_objects.get(name, _MISSING)
+    if value is _MISSING:
+        with _lazy_lock:
+            if name not in _lazy_objects:
+                _lazy_objects[name] = factory()
+            value = _lazy_objects[name]
+    return value
+
+
+def _create_engine():
+    # If DATABASE_URL is not set there is no engine (for optional DB)
+    if not DATABASE_URL:
+        return None
+    sync_engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+    # Per-statement timings for /api/metrics
+    if metrics_enabled():
+        instrument_engine(sync_engine)
+    return sync_engine
+
+
+def _create_async_engine():
+    if not ASYNC_DATABASE_URL:
+        return None
+    created = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+    if metrics_enabled():
+        instrument_engine(created.sync_engine)
+    database_breaker.attach(created.sync_engine)
+    return created
+
+
+def _create_sessionmaker():
+    sync_engine = get_engine()
+    return sessionmaker(autocommit=False, autoflush=False, bind=sync_engine) if sync_engine else None
+
+
+def _create_async_sessionmaker():
+    # Objects stay usable after commit for serialization
+    created = get_async_engine()
+    return async_sessionmaker(bind=created, autoflush=False, expire_on_commit=False) if created else None
+
+
+def get_engine():
+    """
+    Sync engine for DATABASE_URL (None when unset), created on first call
+    """
+    return _lazy("engine", _create_engine)
+
+
+def get_async_engine():
+    """
+    Async engine for ASYNC_DATABASE_URL (None when unset), created on first call
+    """
+    return _lazy("async_engine", _create_async_engine)
+
+
+def get_sessionmaker():
+    """
+    Sync session factory (None without a database)
+    """
+    return _lazy("SessionLocal", _create_sessionmaker)
+
+
+def get_async_sessionmaker():
+    """
+    Async session factory (None without a database)
+    """
+    return _lazy("AsyncSessionLocal", _create_async_sessionmaker)
+
+
+# database.engine, database.async_engine, database.SessionLocal and
+# database.AsyncSessionLocal resolve through the getters above
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "async_engine": get_async_engine,
+    "SessionLocal": get_sessionmaker,
+    "AsyncSessionLocal": get_async_sessionmaker,
+}
+
+
+def __getattr__(name: str):
+    getter = _LAZY_ATTRIBUTES.get(name)
+    if getter is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getter()
+
+
+@event.listens_for(Session, "after_begin")
+def apply_statement_timeout(session, transaction, connection):
+    """
+    Apply a session's statement timeout override to each of its transactions (PostgreSQL)
+    """
+    seconds = session.info.get(STATEMENT_TIMEOUT_KEY)
+    if seconds is not None and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(seconds * 1000)}")
 
 # Base class for models
 Base = declarative_base()
 
 
+@compiles(functions.now, "sqlite")
+def sqlite_now(element, compiler, **kw):
+    """
+    Render now() on SQLite in the same text format SQLAlchemy stores datetimes in,
+    so server-set entry_date values compare correctly with bound parameters
+    """
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
 def get_db():
     """
     Dependency function to get database session
@@ -39,16 +228,109 @@ def get_db():
     Yields:
         Session: SQLAlchemy database session
     """
-    if SessionLocal is None:
+    session_factory = get_sessionmaker()
+    if session_factory is None:
         raise RuntimeError("Database not configured. Please set DATABASE_URL environment variable.")
     
-    db = SessionLocal()
+    db = session_factory()
     try:
         yield db
     finally:
         db.close()
 
 
+def new_async_session():
+    """
+    Open an async session for code that manages its own session lifetime
+
+    Returns:
+        AsyncSession: SQLAlchemy async database session (caller must close it)
+    """
+    session_factory = get_async_sessionmaker()
+    if session_factory is None:
+        raise RuntimeError("Database not configured. Please set DATABASE_URL environment variable.")
+
+    return session_factory()
+
+
+async def get_async_db():
+    """
+    Dependency function to get an async database session
+
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+
+    Raises:
+        CircuitOpenError: while the database circuit breaker is open
+    """
+    database_breaker.check()
+    async with new_async_session() as db:
+        yield db
+
+
+def get_async_db_with_statement_timeout(seconds: float):
+    """
+    Dependency like get_async_db whose transactions use another statement timeout
+
+    The override costs one `SET LOCAL statement_timeout` per transaction on
+    PostgreSQL, so it is meant for routes whose statements legitimately run
+    longer (or must fail sooner) than DB_STATEMENT_TIMEOUT_SECONDS.
+    """
+    async def get_db():
+        database_breaker.check()
+        async with new_async_session() as db:
+            db.info[STATEMENT_TIMEOUT_KEY] = seconds
+            yield db
+
+    return get_db
+
+
+# Session dependency of the bulk endpoints
+get_async_bulk_db = get_async_db_with_statement_timeout(BULK_STATEMENT_TIMEOUT_SECONDS)
+
+
+async def dispose_engines():
+    """
+    Close every pooled connection of the async and sync engines (on shutdown)
+
+    Engines that were never used aren't created just to be disposed.
+    """
+    if _lazy_objects.get("async_engine"):
+        await _lazy_objects["async_engine"].dispose()
+    if _lazy_objects.get("engine"):
+        _lazy_objects["engine"].dispose()
+
+
+def describe_database_error(e: Exception) -> str:
+    """
+    Turn a connection/query exception into a user-facing error message
+
+    Args:
+        e: Exception raised while talking to the database
+
+    Returns:
+        str: Error message with a hint for common misconfigurations
+    """
+    error_str = str(e)
+    
+    if isinstance(e, SQLAlchemyError):
+        # Categorize common errors for better user experience
+        if "invalid dsn" in error_str.lower() or "invalid connection option" in error_str.lower():
+            return f"Invalid database connection string: {error_str}. Please check your DATABASE_URL format."
+        elif "could not connect" in error_str.lower() or "connection refused" in error_str.lower():
+            return f"Could not connect to database server: {error_str}. Is PostgreSQL running?"
+        elif "authentication failed" in error_str.lower() or "password authentication failed" in error_str.lower():
+            return f"Database authentication failed: {error_str}. Please check your credentials."
+        elif "database" in error_str.lower() and "does not exist" in error_str.lower():
+            return f"Database does not exist: {error_str}. Please create the database first."
+        return error_str
+    
+    # Check for connection-related errors
+    if "connection" in error_str.lower() or "refused" in error_str.lower() or "timeout" in error_str.lower():
+        return f"Connection error: {error_str}. Is PostgreSQL running and accessible?"
+    return f"Unexpected error: {error_str}"
+
+
 def check_database_connection() -> dict:
     """
     Check database connectivity
@@ -56,6 +338,7 @@ def check_database_connection() -> dict:
     Returns:
         dict: Connection status with details
     """
+    engine = get_engine()
     if not engine:
         return {
             "connected": False,
@@ -72,34 +355,84 @@ def check_database_connection() -> dict:
             "connected": True,
             "message": "Database connection successful"
         }
-    except SQLAlchemyError as e:
-        error_str = str(e)
-        error_msg = error_str
-        
-        # Categorize common errors for better user experience
-        if "invalid dsn" in error_str.lower() or "invalid connection option" in error_str.lower():
-            error_msg = f"Invalid database connection string: {error_str}. Please check your DATABASE_URL format."
-        elif "could not connect" in error_str.lower() or "connection refused" in error_str.lower():
-            error_msg = f"Could not connect to database server: {error_str}. Is PostgreSQL running?"
-        elif "authentication failed" in error_str.lower() or "password authentication failed" in error_str.lower():
-            error_msg = f"Database authentication failed: {error_str}. Please check your credentials."
-        elif "database" in error_str.lower() and "does not exist" in error_str.lower():
-            error_msg = f"Database does not exist: {error_str}. Please create the database first."
-        
+    except Exception as e:
+        return {
+            "connected": False,
+            "error": describe_database_error(e)
+        }
+
+
+async def check_async_database_connection(timeout: float, target=None) -> dict:
+    """
+    Check database connectivity through an async engine, bounded by a timeout
+    
+    Args:
+        timeout: Seconds to wait for connect + SELECT 1
+        target: Async engine to check (default: the primary async engine)
+    
+    Returns:
+        dict: Connection status with details
+    """
+    target = target or get_async_engine()
+    if not target:
+        return {
+            "connected": False,
+            "error": "Database not configured. DATABASE_URL environment variable not set."
+        }
+    
+    async def probe():
+        async with target.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    
+    try:
+        await asyncio.wait_for(probe(), timeout)
+        return {
+            "connected": True,
+            "message": "Database connection successful"
+        }
+    except asyncio.TimeoutError:
         return {
             "connected": False,
-            "error": error_msg
+            "error": f"Connection error: no response from the database within {timeout:g}s. Is PostgreSQL running and accessible?"
         }
     except Exception as e:
-        error_str = str(e)
-        # Check for connection-related errors
-        if "connection" in error_str.lower() or "refused" in error_str.lower() or "timeout" in error_str.lower():
-            return {
-                "connected": False,
-                "error": f"Connection error: {error_str}. Is PostgreSQL running and accessible?"
-            }
         return {
             "connected": False,
-            "error": f"Unexpected error: {error_str}"
+            "error": describe_database_error(e)
         }
 
+
+def pool_statistics(pool) -> dict:
+    """
+    Snapshot of a connection pool's usage
+    
+    Args:
+        pool: SQLAlchemy pool (e.g. async_engine.pool)
+    
+    Returns:
+        dict: size, checked_in, checked_out, overflow and waiters (None when
+        the pool type doesn't track a value)
+    """
+    def read(name):
+        method = getattr(pool, name, None)
+        return method() if callable(method) else None
+    
+    # Tasks/threads blocked waiting for a connection; read from the pool's
+    # internal queue since SQLAlchemy has no public accessor for it
+    queue = getattr(pool, "_pool", None)
+    waiters = None
+    if queue is not None:
+        inner = getattr(queue, "_queue", None)  # asyncio.Queue behind AsyncAdaptedQueue
+        if inner is not None and hasattr(inner, "_getters"):
+            waiters = len(inner._getters)
+        elif hasattr(getattr(queue, "not_empty", None), "_waiters"):
+            waiters = len(queue.not_empty._waiters)
+    
+    return {
+        "pool_class": type(pool).__name__,
+        "size": read("size"),
+        "checked_in": read("checkedin"),
+        "checked_out": read("checkedout"),
+        "overflow": read("overflow"),
+        "waiters": waiters,
+    }
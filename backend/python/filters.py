@@ -0,0 +1,61 @@
+"""
+Server-side filters and sort orders for the example list
+
+GET /api/examples narrows rows with `isActive` and an entry date range
+(`from` inclusive, `to` exclusive) and orders them by one of LIST_SORTS.
+Every combination is served by an index that also yields the keyset order,
+so no filter degrades into a full scan or an in-memory sort:
+
+- no isActive filter: ix_example_entry_date_id (range scan for from/to)
+- isActive=true: partial index ix_example_active_entry_date_id
+- isActive=false: partial index ix_example_inactive_entry_date_id
+
+benchmarks.query_plans checks this with EXPLAIN for each combination.
+"""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+
+from models import Example
+
+# Accepted `sort` values and whether each orders descending
+LIST_SORTS = {"-entryDate": True, "entryDate": False}
+DEFAULT_SORT = "-entryDate"
+
+
+def parse_sort(sort: str) -> bool:
+    """
+    Whether `sort` orders descending
+
+    Raises:
+        HTTPException: 400 for sort values outside LIST_SORTS
+    """
+    if sort not in LIST_SORTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sort: {sort}. Allowed: {', '.join(LIST_SORTS)}",
+        )
+    return LIST_SORTS[sort]
+
+
+def filter_examples(query, is_active: Optional[bool] = None, entry_from: Optional[datetime] = None,
+                    entry_to: Optional[datetime] = None):
+    """
+    Apply the list filters to a select() of Example columns
+
+    isActive is rendered as a literal predicate (not a bound parameter) so it
+    matches the partial indexes' WHERE clauses.
+
+    Raises:
+        HTTPException: 400 if `from` is after `to`
+    """
+    if entry_from is not None and entry_to is not None and entry_from > entry_to:
+        raise HTTPException(status_code=400, detail="`from` must not be after `to`")
+    if is_active is not None:
+        query = query.where(Example.is_active if is_active else ~Example.is_active)
+    if entry_from is not None:
+        query = query.where(Example.entry_date >= entry_from)
+    if entry_to is not None:
+        query = query.where(Example.entry_date < entry_to)
+    return query
@@ -0,0 +1,171 @@
+"""
+Opt-in group commit for POST /api/examples
+
+With GROUP_COMMIT_ENABLED=true, create_example doesn't run its own
+transaction: the validated row goes into a per-worker queue and the request
+waits. A single flusher task takes up to GROUP_COMMIT_MAX_BATCH queued rows,
+waiting at most GROUP_COMMIT_MAX_DELAY_MS after the first one, and writes
+them with one multi-row INSERT ... RETURNING plus the usual rollup, version
+and change-feed updates in one transaction. Each request then resolves with
+its own row (id, entry_date, ...). Under a burst this turns hundreds of
+commits into a handful and uses one pooled connection instead of one per
+request; when idle it adds at most the delay to a create.
+
+The queue holds at most GROUP_COMMIT_MAX_DEPTH rows; beyond that creates are
+rejected with 503 + Retry-After (QueueFullError) instead of piling up.
+
+If a batch fails for a reason other than the connection, its rows are
+retried one transaction each, so a row the database rejects fails only its
+own request. A request cancelled while waiting (client disconnect) does not
+withdraw its row; it is still created.
+"""
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from changefeed import example_events, publish_changes
+from circuit_breaker import is_connection_failure
+from crud import insert_many
+from database import new_async_session
+from metrics import group_commit_batch_size, group_commit_rejected_total
+from models import Example
+from stats import adjust_stats
+from versioning import bump_version, publish_version
+
+
+class QueueFullError(Exception):
+    """
+    The group-commit queue is at GROUP_COMMIT_MAX_DEPTH
+    """
+
+
+class GroupCommitQueue:
+    """
+    Per-worker queue of pending creates, flushed as multi-row inserts by one task
+    """
+
+    def __init__(self, max_batch: int = 100, max_delay_ms: float = 5.0, max_depth: int = 1000):
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self.max_depth = max_depth
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, values: Dict[str, Any]) -> Example:
+        """
+        Queue one row and wait until the batch containing it has committed
+
+        Raises:
+            QueueFullError: if GROUP_COMMIT_MAX_DEPTH rows are already waiting
+            Exception: whatever inserting this row raised
+        """
+        if len(self._pending) >= self.max_depth:
+            group_commit_rejected_total.inc(("queue_full",))
+            raise QueueFullError(f"{len(self._pending)} creates are already queued")
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((values, future))
+        self._wakeup.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if not self._pending:
+                if self._closing:
+                    return
+                self._wakeup.clear()
+                continue
+            # Let the batch fill up for at most max_delay after its first row
+            if len(self._pending) < self.max_batch and not self._closing:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            if len(self._pending) < self.max_batch:
+                self._full.clear()
+            await self.flush(batch)
+
+    async def flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """
+        Insert a batch in one transaction and resolve its futures
+        """
+        try:
+            created = await self._insert([values for values, _ in batch])
+        except Exception as e:
+            group_commit_batch_size.observe(("failed",), len(batch))
+            if len(batch) == 1 or is_connection_failure(e):
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            # Isolate the row(s) the database rejected
+            for item in batch:
+                await self.flush([item])
+            return
+        group_commit_batch_size.observe(("committed",), len(batch))
+        for (_, future), example in zip(batch, created):
+            if not future.done():
+                future.set_result(example)
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> List[Example]:
+        db = new_async_session()
+        try:
+            created = await insert_many(db, rows)
+            await adjust_stats(db, [example.id for example in created], 1)
+            generation = await bump_version(db)
+            await publish_changes(db, generation, "created", example_events(created))
+            await db.commit()
+            await publish_version(db)
+            return created
+        except Exception:
+            await db.rollback()
+            raise
+        finally:
+            await db.close()
+
+    def start(self) -> None:
+        """
+        Start the flusher task on the running loop (idempotent)
+        """
+        if self._task is not None and not self._task.done() and self._task.get_loop() is asyncio.get_running_loop():
+            return
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="group-commit")
+
+    async def stop(self) -> None:
+        """
+        Commit whatever is still queued, then let the flusher task finish
+        """
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        self._full.set()
+        await self._task
+        self._task = None
+
+
+def create_group_commit_queue() -> Optional[GroupCommitQueue]:
+    """
+    Build the queue from GROUP_COMMIT_* environment variables (None unless enabled)
+    """
+    if os.getenv("GROUP_COMMIT_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        return None
+    return GroupCommitQueue(
+        max_batch=int(os.getenv("GROUP_COMMIT_MAX_BATCH", "100")),
+        max_delay_ms=float(os.getenv("GROUP_COMMIT_MAX_DELAY_MS", "5")),
+        max_depth=int(os.getenv("GROUP_COMMIT_MAX_DEPTH", "1000")),
+    )
@@ -0,0 +1,119 @@
+"""
+Background database health prober
+
+A single asyncio task per worker runs `SELECT 1` through the async engine
+every DB_HEALTH_INTERVAL_SECONDS, bounded by DB_HEALTH_TIMEOUT_SECONDS, and
+keeps the last result. /api/health/db serves that result, so frequent
+liveness/readiness polls never open connections themselves and never hang
+on a stalled database. Read replicas are probed on the same schedule, which
+returns recovered replicas to the read rotation.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Optional
+
+from database import ASYNC_DATABASE_URL, check_async_database_connection, database_breaker, get_async_engine, pool_statistics
+from replicas import read_replicas
+
+
+class DatabaseProber:
+    """
+    Periodically probes the database and caches the outcome
+    """
+
+    def __init__(self, interval_seconds: float, timeout_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.timeout_seconds = timeout_seconds
+        self._status: Optional[dict] = None
+        self._checked_at_monotonic = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def probe(self) -> dict:
+        """
+        Run one probe now and cache its result
+        """
+        start = time.perf_counter()
+        status = await check_async_database_connection(self.timeout_seconds)
+        status["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        status["checked_at"] = datetime.utcnow()
+        status["replicas"] = list(await asyncio.gather(*map(self.probe_replica, read_replicas.replicas)))
+        self._status = status
+        self._checked_at_monotonic = time.monotonic()
+        return status
+
+    async def probe_replica(self, replica) -> dict:
+        """
+        Probe one read replica and update its place in the read rotation
+        """
+        start = time.perf_counter()
+        result = await check_async_database_connection(self.timeout_seconds, replica.engine)
+        if result["connected"]:
+            replica.mark_up()
+        else:
+            replica.mark_down(result["error"])
+        return {
+            "name": replica.name,
+            "connected": result["connected"],
+            "error": result.get("error"),
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        """
+        Start the background loop (idempotent)
+        """
+        if ASYNC_DATABASE_URL is None or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(), name="database-prober")
+
+    async def stop(self) -> None:
+        """
+        Cancel the background loop and wait for it to finish
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def is_stale(self) -> bool:
+        return self._status is None or time.monotonic() - self._checked_at_monotonic > 2 * self.interval_seconds
+
+    async def status(self) -> dict:
+        """
+        Last probe result plus current pool statistics and circuit breaker state
+
+        Served from the cache while the background loop keeps it fresh; if
+        the loop isn't running (e.g. the app was started without lifespan
+        events) a stale result is refreshed inline, one probe at a time.
+        """
+        if self.is_stale():
+            async with self._lock:
+                if self.is_stale():
+                    await self.probe()
+        status = dict(self._status)
+        configured = ASYNC_DATABASE_URL is not None
+        status["pool"] = pool_statistics(get_async_engine().pool) if configured else None
+        status["circuit"] = database_breaker.status() if configured else None
+        return status
+
+
+def create_database_prober() -> DatabaseProber:
+    """
+    Build the process-wide prober from environment variables
+    """
+    return DatabaseProber(
+        interval_seconds=float(os.getenv("DB_HEALTH_INTERVAL_SECONDS", "5")),
+        timeout_seconds=float(os.getenv("DB_HEALTH_TIMEOUT_SECONDS", "2")),
+    )
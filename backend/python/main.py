@@ -1,22 +1,80 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
-from datetime import datetime
-from pydantic import BaseModel
-from typing import Optional, List
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from datetime import date, datetime
+from pydantic import BaseModel, ValidationError
+from typing import Any, Optional, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import math
+import orjson
 import os
-import yaml
-from dotenv import load_dotenv
-import signal
-import sys
-import uvicorn
-from database import check_database_connection, get_db
+from admission import AdmissionControlMiddleware, admission_enabled, admission_options
+from cache import create_example_cache
+from changefeed import change_feed, example_events, publish_changes
+from compression import CompressionMiddleware, compression_enabled, compression_options
+from crud import (
+    MAX_BULK_ITEMS, create_values, delete_many, delete_one, insert_many, update_many, update_one, update_values,
+    validation_message, version_condition,
+)
+from circuit_breaker import CircuitOpenError, is_connection_failure
+from database import database_breaker, dispose_engines, get_async_bulk_db, get_async_db
+from health import create_database_prober
+from metrics import CONTENT_TYPE, MetricsMiddleware, create_multiprocess_store, metrics_enabled, render_metrics
+from export import ENCODERS, EXPORT_FORMATS, ExportResponse, export_query
+from filters import DEFAULT_SORT, LIST_SORTS, filter_examples, parse_sort
+from group_commit import QueueFullError, create_group_commit_queue
 from models import Example
-from schemas import ExampleResponse, CreateExampleDto, UpdateExampleDto
+from openapi_docs import OpenAPIDocuments, serve_json_from_cache
+from replicas import STICKY_HEADER, ReadYourWritesMiddleware, get_async_read_db, read_replicas
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, set_next_page
+from search import ranked_position, search_query
+from server import server_options
+from stats import adjust_stats, example_stats
+from serialization import encode_examples, encode_sparse_example, encode_sparse_examples, parse_fields, select_columns
+from versioning import (
+    bump_version, current_version, etag_matches, example_etag, if_match_versions, make_etag, not_modified,
+    publish_version,
+)
+from schemas import (
+    ExampleResponse, CreateExampleDto, UpdateExampleDto,
+    BulkUpdateExampleDto, BulkDeleteDto, BulkItemResult, BulkResponse, ExampleStatsResponse,
+)
+
+# Environment variables from .env are loaded once, by database.py (imported above)
+
+# Background database probe behind /api/health/db
+database_prober = create_database_prober()
+
+# Cross-worker snapshot files for /api/metrics (None with a single worker)
+metrics_store = create_multiprocess_store()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start background tasks on startup; on shutdown (after uvicorn has drained
+    in-flight requests) stop them and close the connection pools
+
+    Change streams are ended as soon as the shutdown signal arrives instead,
+    since they would otherwise hold the drain open until its timeout.
+    """
+    database_prober.start()
+    change_feed.start()
+    change_feed.close_streams_on_exit_signals()
+    if metrics_store:
+        metrics_store.start()
+    yield
+    await change_feed.stop()
+    if group_commit:
+        await group_commit.stop()
+    await database_prober.stop()
+    if metrics_store:
+        await metrics_store.stop()
+    await read_replicas.dispose()
+    await dispose_engines()
 
-# Load environment variables
-load_dotenv()
 
 # Create FastAPI app
 app = FastAPI(
@@ -25,10 +83,32 @@ app = FastAPI(
     description="Minimal backend API with health check endpoint",
     docs_url="/api/swagger",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
 )
 
 PORT = int(os.getenv("PORT", 8080))
 
+# OpenAPI JSON/YAML rendered once and served from memory
+openapi_documents = OpenAPIDocuments(app)
+serve_json_from_cache(app, openapi_documents)
+
+# Read-through cache for GET /api/examples/{id}, invalidated by every write
+example_cache = create_example_cache()
+
+# Opt-in batching of POST /api/examples (None unless GROUP_COMMIT_ENABLED)
+group_commit = create_group_commit_queue()
+
+# Bounded concurrency with priority queues, shedding 503s under overload
+# (innermost, so shed responses still get CORS headers and are counted in metrics).
+# Batched creates are bounded by the group-commit queue instead.
+if admission_enabled():
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        routes=app.router.routes,
+        exempt_routes=["POST /api/examples"] if group_commit else [],
+        **admission_options(),
+    )
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -36,8 +116,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Link", "X-Next-Cursor", STICKY_HEADER],
 )
 
+# Route a client's reads to the primary right after its own writes
+if read_replicas.replicas:
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=read_replicas.sticky_seconds)
+
+# Negotiated gzip/brotli for larger text responses (inside metrics, so its cost is measured)
+if compression_enabled():
+    app.add_middleware(CompressionMiddleware, **compression_options())
+
+# Request counts and latency for /api/metrics (outermost, so it times every layer)
+if metrics_enabled():
+    app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    """
+    Answer 503 right away while the database circuit breaker is open
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
 
 # Response models
 class HealthResponse(BaseModel):
@@ -45,6 +150,56 @@ class HealthResponse(BaseModel):
     timestamp: datetime
 
 
+class CacheStatsResponse(BaseModel):
+    """
+    Example cache counters
+    """
+    enabled: bool
+    shared_backend: Optional[str] = None
+    local_entries: int
+    local_max_entries: int
+    hits: int
+    shared_hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    errors: int
+
+
+class PoolStatsResponse(BaseModel):
+    """
+    Connection pool usage of this worker's async engine
+    """
+    pool_class: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    waiters: Optional[int] = None
+
+
+class ReplicaHealthResponse(BaseModel):
+    """
+    Last probe result of one read replica
+    """
+    name: str
+    connected: bool
+    error: Optional[str] = None
+    latency_ms: Optional[float] = None
+
+
+class CircuitBreakerResponse(BaseModel):
+    """
+    Database circuit breaker state of this worker
+    """
+    state: str
+    consecutive_failures: int
+    failure_threshold: int
+    retry_after_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+
+
 class DatabaseHealthResponse(BaseModel):
     """
     Database health check response model
@@ -53,6 +208,11 @@ class DatabaseHealthResponse(BaseModel):
     message: Optional[str] = None
     error: Optional[str] = None
     timestamp: datetime
+    checked_at: Optional[datetime] = None
+    latency_ms: Optional[float] = None
+    pool: Optional[PoolStatsResponse] = None
+    circuit: Optional[CircuitBreakerResponse] = None
+    replicas: List[ReplicaHealthResponse] = []
 
 
 @app.get("/api/health", tags=["Health"], operation_id="apiHealthGet", response_model=HealthResponse)
@@ -76,35 +236,61 @@ async def health_check_db():
     """
     Database connectivity check endpoint
 
-    Verifies the connection status to the PostgreSQL database.
-    Checks if the database is accessible and responding to queries.
+    Reports the result of the most recent background probe (SELECT 1 with a
+    timeout, run every DB_HEALTH_INTERVAL_SECONDS) instead of querying the
+    database on every call, together with the probe latency, the
+    connection pool statistics and the circuit breaker state of this worker.
 
     Returns:
         DatabaseHealthResponse: Database connection status with details
         
     Example responses:
-        - Success: {"connected": true, "message": "Database connection successful", "timestamp": "..."}
+        - Success: {"connected": true, "message": "Database connection successful", "latency_ms": 1.2, "pool": {...}, ...}
         - Error: {"connected": false, "error": "Connection error details", "timestamp": "..."}
         - Not configured: {"connected": false, "error": "DATABASE_URL not set", "timestamp": "..."}
     """
-    db_status = check_database_connection()
+    db_status = await database_prober.status()
     
     return {
         "connected": db_status["connected"],
         "message": db_status.get("message"),
         "error": db_status.get("error"),
-        "timestamp": datetime.utcnow()
+        "timestamp": datetime.utcnow(),
+        "checked_at": db_status.get("checked_at"),
+        "latency_ms": db_status.get("latency_ms"),
+        "pool": db_status.get("pool"),
+        "circuit": db_status.get("circuit"),
+        "replicas": db_status.get("replicas", []),
     }
 
 
+@app.get("/api/health/cache", tags=["Health"], operation_id="apiHealthCacheGet", response_model=CacheStatsResponse)
+async def health_check_cache():
+    """
+    Example cache statistics
+
+    Returns hit/miss/eviction counters of this worker's example cache.
+    """
+    return example_cache.stats()
+
+
+@app.get("/api/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics
+
+    Request counters and latency histograms per route, and database statement
+    timings, summed over all workers when METRICS_MULTIPROC_DIR is set.
+    """
+    return Response(content=render_metrics(metrics_store), media_type=CONTENT_TYPE)
+
+
 @app.get("/api/openapi.yaml", include_in_schema=False)
-async def get_openapi_yaml():
+async def get_openapi_yaml(request: Request):
     """
-    Serve OpenAPI spec as YAML
+    Serve OpenAPI spec as YAML (rendered once, with gzip and ETag support)
     """
-    openapi_schema = app.openapi()
-    yaml_content = yaml.dump(openapi_schema, default_flow_style=False)
-    return Response(content=yaml_content, media_type="text/yaml")
+    return openapi_documents.response("yaml", request)
 
 
 # ============================================================================
@@ -117,21 +303,50 @@ async def get_openapi_yaml():
     operation_id="apiExamplesGet",
     response_model=List[ExampleResponse],
     summary="Get all examples",
-    description="Retrieves all example records from the database, ordered by entry date descending"
+    description="Retrieves example records ordered by entry date (newest first unless `sort=entryDate`), "
+                "one page at a time, optionally filtered by `isActive` and an entry date range. "
+                "When more rows exist the next page is advertised in the `Link` (rel=\"next\") "
+                "and `X-Next-Cursor` response headers. Responses carry an ETag; send it back in "
+                "`If-None-Match` to get 304 Not Modified while nothing has been written."
 )
-async def get_all_examples(db: Session = Depends(get_db)):
+async def get_all_examples(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of examples to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+    is_active: Optional[bool] = Query(None, alias="isActive", description="Only active (true) or inactive (false) examples"),
+    entry_from: Optional[datetime] = Query(None, alias="from", description="Entry date lower bound (inclusive, ISO 8601)"),
+    entry_to: Optional[datetime] = Query(None, alias="to", description="Entry date upper bound (exclusive, ISO 8601)"),
+    sort: str = Query(DEFAULT_SORT, description=f"Sort order, one of: {', '.join(LIST_SORTS)}"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. `id,name,isActive` (default: all fields)"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """
     Get all examples
     
-    Returns a list of all examples ordered by entry date (newest first)
+    Returns a page of examples ordered by entry date (newest first by default),
+    filtered in the database (see filters.py). Rows are selected as column
+    tuples and encoded directly (see serialization.py); with `fields` only the
+    requested columns are selected and returned.
     """
     try:
-        examples = db.query(Example).order_by(Example.entry_date.desc()).all()
-        return examples
+        selected = parse_fields(fields)
+        descending = parse_sort(sort)
+        query = filter_examples(select(*select_columns(selected)), is_active, entry_from, entry_to)
+        etag = make_etag(await current_version(db), request)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        result = await db.execute(paginate(query, limit, cursor, descending=descending))
+        rows = set_next_page(request, headers, result.all(), limit)
+        content = encode_examples(rows) if selected is None else encode_sparse_examples(rows, selected)
+        return Response(content=content, media_type="application/json", headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = str(e)
         # Check if it's a database connection error
-        if "connection" in error_msg.lower() or "refused" in error_msg.lower() or "could not connect" in error_msg.lower():
+        if is_connection_failure(e):
             raise HTTPException(
                 status_code=503,
                 detail="Database connection failed. Please ensure PostgreSQL is running and DATABASE_URL is correctly configured."
@@ -145,25 +360,36 @@ async def get_all_examples(db: Session = Depends(get_db)):
     operation_id="apiExamplesSearchGet",
     response_model=List[ExampleResponse],
     summary="Search examples by name",
-    description="Search examples by name (case-insensitive partial match)"
+    description="Search examples by name (case-insensitive partial match), best matches first. "
+                "Paginated like GET /api/examples."
 )
 async def search_examples(
+    request: Request,
     name: str = Query(..., description="Name to search for"),
-    db: Session = Depends(get_db)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of examples to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. `id,name,isActive` (default: all fields)"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Search examples by name
     
-    Searches for examples where the name contains the provided string (case-insensitive)
+    Searches for examples where the name contains the provided string (case-insensitive),
+    ordered by relevance (trigram similarity on PostgreSQL) and then by entry date
     """
     try:
-        examples = db.query(Example).filter(
-            Example.name.ilike(f"%{name}%")
-        ).order_by(Example.entry_date.desc()).all()
-        return examples
+        selected = parse_fields(fields)
+        query, rank = search_query(db.get_bind().dialect.name, name, select_columns(selected))
+        result = await db.execute(paginate(query, limit, cursor, rank=rank))
+        headers = {}
+        rows = set_next_page(request, headers, result.all(), limit, position=ranked_position)
+        content = encode_examples(rows) if selected is None else encode_sparse_examples(rows, selected)
+        return Response(content=content, media_type="application/json", headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = str(e)
-        if "connection" in error_msg.lower() or "refused" in error_msg.lower() or "could not connect" in error_msg.lower():
+        if is_connection_failure(e):
             raise HTTPException(
                 status_code=503,
                 detail="Database connection failed. Please ensure PostgreSQL is running and DATABASE_URL is correctly configured."
@@ -171,30 +397,408 @@ async def search_examples(
         raise HTTPException(status_code=500, detail=f"Error searching examples: {error_msg}")
 
 
+@app.get(
+    "/api/examples/export",
+    tags=["Examples"],
+    operation_id="apiExamplesExportGet",
+    response_class=StreamingResponse,
+    summary="Export all examples",
+    description="Streams every example, newest first, as NDJSON (one ExampleResponse object per line) or CSV",
+    responses={200: {"content": {media_type: {} for media_type in EXPORT_FORMATS.values()}}},
+)
+async def export_examples(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+):
+    """
+    Export all examples
+
+    Reads the table through a server-side cursor and streams it batch by batch,
+    so memory use does not grow with the number of rows. Like the other reads
+    it uses a replica when one is configured and available.
+    """
+    db = None
+    try:
+        db = read_replicas.session(request)
+        if "replica" not in db.info:
+            database_breaker.check()
+        result = await db.stream(export_query())
+    except CircuitOpenError:
+        await db.close()
+        raise
+    except Exception as e:
+        if db is not None:
+            await db.close()
+        error_msg = str(e)
+        if is_connection_failure(e):
+            raise HTTPException(
+                status_code=503,
+                detail="Database connection failed. Please ensure PostgreSQL is running and DATABASE_URL is correctly configured."
+            )
+        raise HTTPException(status_code=500, detail=f"Error exporting examples: {error_msg}")
+
+    return ExportResponse(
+        db, result, ENCODERS[format],
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="examples.{format}"'},
+    )
+
+
+@app.get(
+    "/api/examples/stats",
+    tags=["Examples"],
+    operation_id="apiExamplesStatsGet",
+    response_model=ExampleStatsResponse,
+    summary="Get example statistics",
+    description="Total, active and inactive counts plus a per-day (UTC entry date) histogram, "
+                "optionally limited to days in [`from`, `to`). Served from a rollup table kept "
+                "current by every write; supports ETag / If-None-Match like GET /api/examples."
+)
+async def get_example_stats(
+    request: Request,
+    day_from: Optional[date] = Query(None, alias="from", description="First day to include (inclusive)"),
+    day_to: Optional[date] = Query(None, alias="to", description="Day to stop at (exclusive)"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Get example statistics
+
+    Reads one rollup row per day and active flag (see stats.py), so the cost
+    grows with the number of days, not the number of examples.
+    """
+    try:
+        if day_from is not None and day_to is not None and day_from > day_to:
+            raise HTTPException(status_code=400, detail="`from` must not be after `to`")
+        etag = make_etag(await current_version(db), request)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        stats = ExampleStatsResponse(**await example_stats(db, day_from, day_to))
+        return Response(content=stats.model_dump_json().encode(), media_type="application/json", headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        error_msg = str(e)
+        if is_connection_failure(e):
+            raise HTTPException(
+                status_code=503,
+                detail="Database connection failed. Please ensure PostgreSQL is running and DATABASE_URL is correctly configured."
+            )
+        raise HTTPException(status_code=500, detail=f"Error fetching example statistics: {error_msg}")
+
+
+@app.get(
+    "/api/examples/stream",
+    tags=["Examples"],
+    operation_id="apiExamplesStreamGet",
+    response_class=StreamingResponse,
+    summary="Stream example changes",
+    description="Server-Sent Events stream of `created`, `updated` (data: the example) and `deleted` "
+                "(data: `{\"id\": ...}`) events. Reconnect with the `Last-Event-ID` header (sent "
+                "automatically by EventSource) or `lastEventId` to receive missed events; a `reset` "
+                "event means they are no longer available and the list should be refetched.",
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_examples(
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    last_event_id_param: Optional[str] = Query(None, alias="lastEventId", description="Resume after this event ID"),
+):
+    """
+    Stream example changes
+
+    Subscribes to this worker's change feed (see changefeed.py); no database
+    connection is held for the client.
+    """
+    subscription = change_feed.subscribe(last_event_id or last_event_id_param)
+    return StreamingResponse(
+        change_feed.stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def bulk_request_body(model) -> dict:
+    """
+    OpenAPI requestBody for a bulk endpoint taking a JSON array of `model`
+
+    Bulk bodies are validated item by item in the handler (so one bad item
+    doesn't reject the batch), which is why the schema is declared here.
+    """
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "maxItems": MAX_BULK_ITEMS, "items": model.model_json_schema()}
+                }
+            },
+        }
+    }
+
+
+async def read_bulk_items(request: Request) -> List[Any]:
+    """
+    Read a bulk request body: a JSON array of at most MAX_BULK_ITEMS items
+    """
+    try:
+        items = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON")
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="Request body must be a non-empty JSON array")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ITEMS} items are allowed per bulk request")
+    return items
+
+
+def bulk_response(results: List[BulkItemResult]) -> BulkResponse:
+    """
+    Wrap per-item results (sorted by request index) with success/failure counts
+    """
+    results.sort(key=lambda item: item.index)
+    succeeded = sum(1 for item in results if item.success)
+    return BulkResponse(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+
+@app.post(
+    "/api/examples/bulk",
+    tags=["Examples"],
+    operation_id="apiExamplesBulkPost",
+    response_model=BulkResponse,
+    summary="Create several examples",
+    description=f"Creates up to {MAX_BULK_ITEMS} examples with a single multi-row INSERT. "
+                "Each item is validated like POST /api/examples; invalid items are reported "
+                "in `results` and the valid ones are still created.",
+    openapi_extra=bulk_request_body(CreateExampleDto),
+)
+async def bulk_create_examples(request: Request, db: AsyncSession = Depends(get_async_bulk_db)):
+    """
+    Create several examples
+
+    Valid items are inserted in one statement and transaction; the response
+    lists the outcome of every item by its index in the request array.
+    """
+    items = await read_bulk_items(request)
+    results = []
+    rows, indexes = [], []
+    for index, item in enumerate(items):
+        try:
+            rows.append(create_values(CreateExampleDto.model_validate(item)))
+            indexes.append(index)
+        except ValidationError as e:
+            results.append(BulkItemResult(index=index, success=False, error=validation_message(e)))
+        except ValueError as e:
+            results.append(BulkItemResult(index=index, success=False, error=str(e)))
+
+    try:
+        created = await insert_many(db, rows)
+        if created:
+            await adjust_stats(db, [example.id for example in created], 1)
+            generation = await bump_version(db)
+            await publish_changes(db, generation, "created", example_events(created))
+        await db.commit()
+        if created:
+            await publish_version(db)
+    except Exception as e:
+        await db.rollback()
+        error_msg = str(e)
+        if is_connection_failure(e):
+            raise HTTPException(
+                status_code=503,
+                detail="Database connection failed. Please ensure PostgreSQL is running and DATABASE_URL is correctly configured."
+            )
+        raise HTTPException(status_code=400, detail=f"Error creating examples: {error_msg}")
+
+    for index, example in zip(indexes, created):
+        results.append(BulkItemResult(
+            index=index, id=example.id, success=True, example=ExampleResponse.model_validate(example)
+        ))
+    return bulk_response(results)
+
+
+@app.patch(
+    "/api/examples/bulk",
+    tags=["Examples"],
+    operation_id="apiExamplesBulkPatch",
+    response_model=BulkResponse,
+    summary="Update several examples",
+    description=f"Applies up to {MAX_BULK_ITEMS} partial updates with a single UPDATE ... FROM (VALUES ...). "
+                "Each item carries the example `id` plus the fields of PUT /api/examples/{id}; "
+                "invalid, duplicate or unknown items are reported in `results`.",
+    openapi_extra=bulk_request_body(BulkUpdateExampleDto),
+)
+async def bulk_update_examples(request: Request, db: AsyncSession = Depends(get_async_bulk_db)):
+    """
+    Update several examples
+
+    Valid items are applied in one statement and transaction; the response
+    lists the outcome of every item by its index in the request array.
+    """
+    items = await read_bulk_items(request)
+    results = []
+    changes, indexes = {}, {}
+    for index, item in enumerate(items):
+        try:
+            data = BulkUpdateExampleDto.model_validate(item)
+            if data.id in changes:
+                raise ValueError(f"Example with ID {data.id} appears more than once")
+            changes[data.id] = update_values(data)
+            indexes[data.id] = index
+        except ValidationError as e:
+            results.append(BulkItemResult(index=index, success=False, error=validation_message(e)))
+        except ValueError as e:
+            results.append(BulkItemResult(index=index, id=item.get("id") if isinstance(item, dict) else None,
+                                          success=False, error=str(e)))
+
+    try:
+        # Only isActive changes move rows between rollup buckets
+        toggled = [id for id, row in changes.items() if "is_active" in row]
+        await adjust_stats(db, toggled, -1)
+        updated = await update_many(db, changes)
+        await adjust_stats(db, toggled, 1)
+        # Items without field changes were returned but not written
+        written = [id for id in updated if changes[id]]
+        if written:
+            generation = await bump_version(db)
+            await publish_changes(db, generation, "updated", example_events(updated[id] for id in written))
+        await db.commit()
+        if written:
+            await publish_version(db)
+        await example_cache.invalidate(written)
+    except Exception as e:
+        await db.rollback()
+        error_msg = str(e)
+        if is_connection_failure(e):
+            raise HTTPException(
+                status_code=503,
+                detail="Database connection failed. Please ensure PostgreSQL is running and DATABASE_URL is correctly configured."
+            )
+        raise HTTPException(status_code=400, detail=f"Error updating examples: {error_msg}")
+
+    for id, index in indexes.items():
+        if id in updated:
+            results.append(BulkItemResult(
+                index=index, id=id, success=True, example=ExampleResponse.model_validate(updated[id])
+            ))
+        else:
+            results.append(BulkItemResult(index=index, id=id, success=False, error=f"Example with ID {id} not found"))
+    return bulk_response(results)
+
+
+@app.delete(
+    "/api/examples/bulk",
+    tags=["Examples"],
+    operation_id="apiExamplesBulkDelete",
+    response_model=BulkResponse,
+    summary="Delete several examples",
+    description=f"Deletes up to {MAX_BULK_ITEMS} examples with a single DELETE ... WHERE id = ANY(...). "
+                "IDs that don't exist (or are repeated) are reported in `results`."
+)
+async def bulk_delete_examples(body: BulkDeleteDto, db: AsyncSession = Depends(get_async_bulk_db)):
+    """
+    Delete several examples
+
+    The response lists the outcome of every ID by its index in `ids`.
+    """
+    if len(body.ids) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ITEMS} items are allowed per bulk request")
+
+    try:
+        await adjust_stats(db, set(body.ids), -1)
+        deleted = set(await delete_many(db, set(body.ids)))
+        if deleted:
+            generation = await bump_version(db)
+            await publish_changes(db, generation, "deleted", [{"id": id} for id in sorted(deleted)])
+        await db.commit()
+        if deleted:
+            await publish_version(db)
+        await example_cache.invalidate(deleted)
+    except Exception as e:
+        await db.rollback()
+        error_msg = str(e)
+        if is_connection_failure(e):
+            raise HTTPException(
+                status_code=503,
+                detail="Database connection failed. Please ensure PostgreSQL is running and DATABASE_URL is correctly configured."
+            )
+        raise HTTPException(status_code=500, detail=f"Error deleting examples: {error_msg}")
+
+    results = []
+    seen = set()
+    for index, id in enumerate(body.ids):
+        if id in seen:
+            results.append(BulkItemResult(index=index, id=id, success=False, error=f"Example with ID {id} appears more than once"))
+        elif id in deleted:
+            results.append(BulkItemResult(index=index, id=id, success=True))
+        else:
+            results.append(BulkItemResult(index=index, id=id, success=False, error=f"Example with ID {id} not found"))
+        seen.add(id)
+    return bulk_response(results)
+
+
 @app.get(
     "/api/examples/{id}",
     tags=["Examples"],
     operation_id="apiExamplesIdGet",
     response_model=ExampleResponse,
     summary="Get example by ID",
-    description="Retrieves a specific example by its ID"
+    description="Retrieves a specific example by its ID. The ETag is the example's version (`\"3\"`): send it back in If-None-Match for a 304, or in If-Match on PUT/DELETE."
 )
-async def get_example_by_id(id: int, db: Session = Depends(get_db)):
+async def get_example_by_id(
+    id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. `id,name,isActive` (default: all fields)"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """
     Get example by ID
     
-    Returns a specific example if found, otherwise returns 404
+    Returns a specific example if found, otherwise returns 404. Served from the
+    example cache when possible; sparse (`fields`) reads select only the
+    requested columns and bypass the cache.
     """
     try:
-        example = db.query(Example).filter(Example.id == id).first()
+        selected = parse_fields(fields)
+        if selected is not None:
+            # The row version is selected last, after the requested fields
+            row = (await db.execute(
+                select(*select_columns(selected), Example.version).where(Example.id == id)
+            )).first()
+            if row is None:
+                raise HTTPException(status_code=404, detail=f"Example with ID {id} not found")
+            etag = example_etag(row[-1], selected)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+            return Response(
+                content=encode_sparse_example(row, selected), media_type="application/json",
+                headers={"ETag": etag, "Cache-Control": "no-cache"},
+            )
+
+        cached, token = await example_cache.lookup(id)
+        if cached is not None:
+            etag = example_etag(orjson.loads(cached)["version"])
+            if etag_matches(request, etag):
+                return not_modified(etag)
+            return Response(content=cached, media_type="application/json", headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+        example = await db.get(Example, id)
         if not example:
             raise HTTPException(status_code=404, detail=f"Example with ID {id} not found")
-        return example
+
+        payload = ExampleResponse.model_validate(example).model_dump_json(by_alias=True).encode()
+        # A lagging replica could pin a pre-write row in the cache
+        if "replica" not in db.info:
+            await example_cache.fill(id, token, payload)
+        etag = example_etag(example.version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return Response(content=payload, media_type="application/json", headers={"ETag": etag, "Cache-Control": "no-cache"})
     except HTTPException:
         raise
     except Exception as e:
         error_msg = str(e)
-        if "connection" in error_msg.lower() or "refused" in error_msg.lower() or "could not connect" in error_msg.lower():
+        if is_connection_failure(e):
             raise HTTPException(
                 status_code=503,
                 detail="Database connection failed. Please ensure PostgreSQL is running and DATABASE_URL is correctly configured."
@@ -211,7 +815,7 @@ async def get_example_by_id(id: int, db: Session = Depends(get_db)):
     summary="Create a new example",
     description="Creates a new example record"
 )
-async def create_example(example_data: CreateExampleDto, db: Session = Depends(get_db)):
+async def create_example(example_data: CreateExampleDto, db: AsyncSession = Depends(get_async_db)):
     """
     Create a new example
     
@@ -219,30 +823,42 @@ async def create_example(example_data: CreateExampleDto, db: Session = Depends(g
     """
     try:
         # Validate required fields
-        if not example_data.name or not example_data.name.strip():
-            raise HTTPException(status_code=400, detail="Name is required")
-        if not example_data.title or not example_data.title.strip():
-            raise HTTPException(status_code=400, detail="Title is required")
+        try:
+            values = create_values(example_data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
+        if group_commit:
+            # Batched with concurrent creates into one INSERT and one commit
+            try:
+                return await group_commit.submit(values)
+            except QueueFullError as e:
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Too many pending creates: {e}",
+                    headers={"Retry-After": "1"},
+                )
+
         # Create new example
-        new_example = Example(
-            name=example_data.name.strip(),
-            title=example_data.title.strip(),
-            description=example_data.description.strip() if example_data.description else None,
-            is_active=example_data.isActive if example_data.isActive is not None else True,
-        )
+        new_example = Example(**values)
         
         db.add(new_example)
-        db.commit()
-        db.refresh(new_example)
+        await db.flush()
+        # Load server-set columns (entry_date) before commit; the change event carries them
+        await db.refresh(new_example)
+        await adjust_stats(db, [new_example.id], 1)
+        generation = await bump_version(db)
+        await publish_changes(db, generation, "created", example_events([new_example]))
+        await db.commit()
+        await publish_version(db)
         
         return new_example
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         error_msg = str(e)
-        if "connection" in error_msg.lower() or "refused" in error_msg.lower() or "could not connect" in error_msg.lower():
+        if is_connection_failure(e):
             raise HTTPException(
                 status_code=503,
                 detail="Database connection failed. Please ensure PostgreSQL is running and DATABASE_URL is correctly configured."
@@ -250,53 +866,95 @@ async def create_example(example_data: CreateExampleDto, db: Session = Depends(g
         raise HTTPException(status_code=400, detail=f"Error creating example: {error_msg}")
 
 
+async def write_miss(db: AsyncSession, id: int, versions: Optional[List[int]]) -> HTTPException:
+    """
+    Error for a single-row UPDATE/DELETE that matched no row: 404, or 412 when
+    If-Match was given and the example exists at another version
+
+    Only this failure path reads the row; successful writes need no lookup.
+    """
+    if versions is not None:
+        current = (await db.execute(select(Example.version).where(Example.id == id))).scalar()
+        if current is not None:
+            return HTTPException(
+                status_code=412,
+                detail=f"Example with ID {id} is at ETag {example_etag(current)}, which If-Match does not list",
+                headers={"ETag": example_etag(current)},
+            )
+    return HTTPException(status_code=404, detail=f"Example with ID {id} not found")
+
+
+IF_MATCH_DESCRIPTION = (
+    "ETag from GET /api/examples/{id} (`\"<version>\"`): only apply the change if the example is still "
+    "at that version (412 otherwise). `*` only requires the example to exist."
+)
+
+
 @app.put(
     "/api/examples/{id}",
     tags=["Examples"],
     operation_id="apiExamplesIdPut",
     response_model=ExampleResponse,
     summary="Update an example",
-    description="Updates an existing example record (partial updates supported)"
+    description="Updates an existing example record (partial updates supported). "
+                "With `If-Match: \"<version>\"` (the example's ETag) the update only applies to that version of the example; "
+                "the response carries the new ETag."
 )
-async def update_example(id: int, example_data: UpdateExampleDto, db: Session = Depends(get_db)):
+async def update_example(
+    id: int,
+    example_data: UpdateExampleDto,
+    response: Response,
+    if_match: Optional[str] = Header(None, alias="If-Match", description=IF_MATCH_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Update an example
     
     Updates an existing example. All fields are optional (partial updates).
+    The row is updated and returned by a single UPDATE ... RETURNING that also
+    checks If-Match, so there is no read before or after the write. A body
+    with no changes (`{}`) writes nothing and returns the current row.
     """
     try:
-        # Find existing example
-        example = db.query(Example).filter(Example.id == id).first()
-        if not example:
-            raise HTTPException(status_code=404, detail=f"Example with ID {id} not found")
-        
-        # Update fields if provided
-        if example_data.name is not None:
-            if not example_data.name.strip():
-                raise HTTPException(status_code=400, detail="Name cannot be empty")
-            example.name = example_data.name.strip()
+        try:
+            changes = update_values(example_data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        versions = if_match_versions(if_match)
         
-        if example_data.title is not None:
-            if not example_data.title.strip():
-                raise HTTPException(status_code=400, detail="Title cannot be empty")
-            example.title = example_data.title.strip()
+        if not changes:
+            # Nothing to change: no write, no new version or change event; the current row is returned
+            example = (await db.execute(
+                select(Example).where(Example.id == id, version_condition(versions))
+            )).scalars().first()
+            if example is None:
+                raise await write_miss(db, id, versions)
+            response.headers["ETag"] = example_etag(example.version)
+            return example
         
-        if example_data.description is not None:
-            example.description = example_data.description.strip() if example_data.description.strip() else None
+        if "is_active" in changes:
+            await adjust_stats(db, [id], -1)
+        example = await update_one(db, id, changes, versions)
+        if example is None:
+            raise await write_miss(db, id, versions)
+        if "is_active" in changes:
+            await adjust_stats(db, [id], 1)
         
-        if example_data.isActive is not None:
-            example.is_active = example_data.isActive
-        
-        db.commit()
-        db.refresh(example)
+        generation = await bump_version(db)
+        await publish_changes(db, generation, "updated", example_events([example]))
+        await db.commit()
+        await publish_version(db)
+        await example_cache.invalidate([id])
         
+        # The new version, for a follow-up conditional update
+        response.headers["ETag"] = example_etag(example.version)
         return example
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         error_msg = str(e)
-        if "connection" in error_msg.lower() or "refused" in error_msg.lower() or "could not connect" in error_msg.lower():
+        if is_connection_failure(e):
             raise HTTPException(
                 status_code=503,
                 detail="Database connection failed. Please ensure PostgreSQL is running and DATABASE_URL is correctly configured."
@@ -310,30 +968,38 @@ async def update_example(id: int, example_data: UpdateExampleDto, db: Session =
     operation_id="apiExamplesIdDelete",
     status_code=204,
     summary="Delete an example",
-    description="Deletes an example record"
+    description="Deletes an example record. "
+                "With `If-Match: \"<version>\"` it is only deleted at that version."
 )
-async def delete_example(id: int, db: Session = Depends(get_db)):
+async def delete_example(
+    id: int,
+    if_match: Optional[str] = Header(None, alias="If-Match", description=IF_MATCH_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
     Delete an example
     
-    Deletes an example by ID. Returns 204 No Content on success.
+    Deletes an example by ID with a single DELETE ... RETURNING (checking
+    If-Match). Returns 204 No Content on success.
     """
     try:
-        # Find existing example
-        example = db.query(Example).filter(Example.id == id).first()
-        if not example:
-            raise HTTPException(status_code=404, detail=f"Example with ID {id} not found")
-        
-        db.delete(example)
-        db.commit()
+        versions = if_match_versions(if_match)
+        await adjust_stats(db, [id], -1)
+        if not await delete_one(db, id, versions):
+            raise await write_miss(db, id, versions)
+        generation = await bump_version(db)
+        await publish_changes(db, generation, "deleted", [{"id": id}])
+        await db.commit()
+        await publish_version(db)
+        await example_cache.invalidate([id])
         
         return Response(status_code=204)
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         error_msg = str(e)
-        if "connection" in error_msg.lower() or "refused" in error_msg.lower() or "could not connect" in error_msg.lower():
+        if is_connection_failure(e):
             raise HTTPException(
                 status_code=503,
                 detail="Database connection failed. Please ensure PostgreSQL is running and DATABASE_URL is correctly configured."
@@ -341,28 +1007,14 @@ async def delete_example(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error deleting example: {error_msg}")
 
 
-# Graceful shutdown handlers
-def handle_shutdown(signum, frame):
-    """Handle graceful shutdown on SIGTERM/SIGINT"""
-    print(f"\n{'SIGTERM' if signum == signal.SIGTERM else 'SIGINT'} signal received: closing server")
-    sys.exit(0)
-
-
-signal.signal(signal.SIGTERM, handle_shutdown)
-signal.signal(signal.SIGINT, handle_shutdown)
-
-
 if __name__ == "__main__":
+    import uvicorn
 
     print(f"Server is running on http://localhost:{PORT}")
     print(f"Swagger UI available at http://localhost:{PORT}/api/swagger")
     print(f"OpenAPI JSON available at http://localhost:{PORT}/api/openapi.json")
     print(f"OpenAPI YAML available at http://localhost:{PORT}/api/openapi.yaml")
 
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=PORT,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    # Graceful shutdown (stop accepting, drain, dispose pools) is handled by
+    # uvicorn's signal handlers and the lifespan above; see server.py
+    uvicorn.run("main:app", **server_options(PORT))
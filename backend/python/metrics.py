@@ -0,0 +1,363 @@
+"""
+Prometheus text-format metrics for HTTP requests and database statements
+
+Request counts (by method, route template and status) and latency histograms
+(by method and route template) are recorded by a plain ASGI middleware;
+statement timings come from SQLAlchemy before/after_cursor_execute events,
+labelled by operation and table so the series count stays bounded.
+
+Each uvicorn worker keeps its own in-memory registry. When
+METRICS_MULTIPROC_DIR is set, every worker periodically writes a snapshot
+of it to that directory and /api/metrics sums the snapshots of all workers,
+so a scrape that lands on any worker sees the whole server.
+"""
+import asyncio
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Latency buckets in seconds
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BATCH_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Counter:
+    """
+    Monotonic counter keyed by a tuple of label values
+    """
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.series: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values: tuple, amount: float = 1.0) -> None:
+        with self._lock:
+            self.series[label_values] = self.series.get(label_values, 0.0) + amount
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [[list(key), value] for key, value in self.series.items()]
+
+
+class Gauge(Counter):
+    """
+    Current value keyed by a tuple of label values (summed across workers)
+    """
+    kind = "gauge"
+
+    def set(self, label_values: tuple, value: float) -> None:
+        with self._lock:
+            self.series[label_values] = float(value)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram keyed by a tuple of label values
+
+    Each series is stored as per-bucket (non-cumulative) counts followed by
+    the +Inf bucket, the sum and the count; buckets are accumulated when
+    rendered so observe() is a bisect and three additions.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.series: Dict[tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: tuple, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            values = self.series.get(label_values)
+            if values is None:
+                values = self.series[label_values] = [0] * (len(self.buckets) + 3)
+            values[index] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [[list(key), list(values)] for key, values in self.series.items()]
+
+
+class Registry:
+    """
+    The metrics of one process, with JSON snapshots for cross-worker merging
+    """
+
+    def __init__(self):
+        self.metrics: List = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def snapshot(self) -> dict:
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+    def render(self, snapshots: Iterable[dict]) -> str:
+        """
+        Sum the given snapshots and render them in Prometheus text format
+        """
+        merged: Dict[str, Dict[tuple, object]] = {metric.name: {} for metric in self.metrics}
+        for snapshot in snapshots:
+            for name, series in snapshot.items():
+                if name not in merged:
+                    continue
+                target = merged[name]
+                for key, value in series:
+                    key = tuple(key)
+                    if isinstance(value, list):
+                        current = target.get(key)
+                        target[key] = value if current is None else [a + b for a, b in zip(current, value)]
+                    else:
+                        target[key] = target.get(key, 0.0) + value
+
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for key, value in sorted(merged[metric.name].items()):
+                labels = ",".join(f'{label}="{escape(v)}"' for label, v in zip(metric.labels, key))
+                if metric.kind != "histogram":
+                    lines.append(f"{metric.name}{{{labels}}} {format_value(value)}")
+                    continue
+                cumulative = 0
+                bounds = [format_value(bound) for bound in metric.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, value[:-2]):
+                    cumulative += count
+                    lines.append(f'{metric.name}_bucket{{{labels},le="{bound}"}} {format_value(cumulative)}')
+                lines.append(f"{metric.name}_sum{{{labels}}} {format_value(value[-2])}")
+                lines.append(f"{metric.name}_count{{{labels}}} {format_value(value[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+def escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by method, route template and status code",
+    ("method", "route", "status"),
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template",
+    ("method", "route"), REQUEST_BUCKETS,
+))
+db_statement_duration_seconds = registry.register(Histogram(
+    "db_statement_duration_seconds", "Database statement execution time by operation and table",
+    ("operation", "table"), STATEMENT_BUCKETS,
+))
+db_statement_errors_total = registry.register(Counter(
+    "db_statement_errors_total", "Database statements that raised, by operation and table",
+    ("operation", "table"),
+))
+group_commit_batch_size = registry.register(Histogram(
+    "group_commit_batch_size", "Rows per group-commit batch by outcome (committed, failed)",
+    ("outcome",), BATCH_BUCKETS,
+))
+group_commit_rejected_total = registry.register(Counter(
+    "group_commit_rejected_total", "Creates rejected by the group-commit queue, by reason",
+    ("reason",),
+))
+admission_in_flight = registry.register(Gauge(
+    "admission_in_flight", "Requests holding an admission slot, by limiter (global or route)",
+    ("limiter",),
+))
+admission_queue_depth = registry.register(Gauge(
+    "admission_queue_depth", "Requests waiting for an admission slot, by limiter and class (read, write)",
+    ("limiter", "class"),
+))
+admission_shed_total = registry.register(Counter(
+    "admission_shed_total", "Requests shed with 503 by admission control, by limiter, class and reason",
+    ("limiter", "class", "reason"),
+))
+
+
+def route_label(scope: dict) -> str:
+    """
+    Route template of a handled request (e.g. /api/examples/{id})
+
+    Paths that matched no route are grouped under one label so scans and
+    typos can't create unbounded series.
+    """
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "endpoint" in scope:
+        return scope["path"]
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts and latency
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Measured to the end of the response body, so streamed exports count in full
+            elapsed = time.perf_counter() - start
+            route = route_label(scope)
+            method = scope["method"]
+            http_requests_total.inc((method, route, str(status)))
+            http_request_duration_seconds.observe((method, route), elapsed)
+
+
+# Table a statement acts on: the first FROM/INTO/UPDATE/TABLE target
+TABLE_PATTERN = re.compile(r'\b(?:FROM|INTO|UPDATE|TABLE)\s+"?(\w+)', re.IGNORECASE)
+STATEMENT_LABELS_CACHE_SIZE = 1024
+_statement_labels: Dict[str, tuple] = {}
+
+
+def statement_labels(statement: str) -> tuple:
+    """
+    (operation, table) labels for a SQL statement, memoized per statement text
+    """
+    labels = _statement_labels.get(statement)
+    if labels is None:
+        operation = (statement.split(None, 1) or ["other"])[0].lower()
+        match = TABLE_PATTERN.search(statement)
+        labels = (operation, match.group(1).lower() if match else "")
+        if len(_statement_labels) < STATEMENT_LABELS_CACHE_SIZE:
+            _statement_labels[statement] = labels
+    return labels
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Time every statement executed through `engine` (pass async_engine.sync_engine for async engines)
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        db_statement_duration_seconds.observe(statement_labels(statement), elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        if context.statement:
+            db_statement_errors_total.inc(statement_labels(context.statement))
+
+
+class MultiprocessStore:
+    """
+    Per-worker snapshot files in METRICS_MULTIPROC_DIR
+
+    Files of exited workers are kept so their counts stay in the totals;
+    clear the directory when the whole server is restarted.
+    """
+
+    def __init__(self, directory: str, flush_seconds: float):
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self.path = os.path.join(directory, f"metrics-{os.getpid()}.json")
+        self._task: Optional[asyncio.Task] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def flush(self) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as handle:
+            json.dump(registry.snapshot(), handle, separators=(",", ":"))
+        os.replace(temp_path, self.path)
+
+    def snapshots(self) -> List[dict]:
+        snapshots = []
+        for name in os.listdir(self.directory):
+            if not (name.startswith("metrics-") and name.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as handle:
+                    snapshots.append(json.load(handle))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            self.flush()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="metrics-flush")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.flush()
+
+
+def metrics_enabled() -> bool:
+    return os.getenv("METRICS_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def create_multiprocess_store() -> Optional[MultiprocessStore]:
+    """
+    Snapshot store from METRICS_MULTIPROC_DIR / METRICS_FLUSH_SECONDS, or None for a single worker
+    """
+    directory = os.getenv("METRICS_MULTIPROC_DIR")
+    if not directory:
+        return None
+    return MultiprocessStore(directory, float(os.getenv("METRICS_FLUSH_SECONDS", "5")))
+
+
+def render_metrics(store: Optional[MultiprocessStore]) -> str:
+    """
+    Exposition text for this worker, or for all workers when a store is configured
+    """
+    if store is None:
+        return registry.render([registry.snapshot()])
+    store.flush()
+    return registry.render(store.snapshots())
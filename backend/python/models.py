@@ -1,8 +1,8 @@
 """
 SQLAlchemy models for the application
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Boolean, Date, DateTime, Index, Sequence
+from sqlalchemy.sql import false, func, true
 from database import Base
 
 
@@ -30,9 +30,73 @@ class Example(Base):
     # Indicates if the example is active (default: true)
     is_active = Column(Boolean, nullable=False, default=True)
     
+    # Row version for If-Match optimistic concurrency, incremented by every update
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
     # Index on entry_date for better query performance
+    # Composite index backing keyset pagination on (entry_date DESC, id DESC)
     __table_args__ = (
         Index('ix_example_entry_date', 'entry_date'),
+        Index('ix_example_entry_date_id', entry_date.desc(), id.desc()),
+        # Partial indexes for the isActive list filter, in the same keyset order
+        Index(
+            'ix_example_active_entry_date_id', entry_date.desc(), id.desc(),
+            postgresql_where=is_active,
+            sqlite_where=is_active == true(),
+        ),
+        Index(
+            'ix_example_inactive_entry_date_id', entry_date.desc(), id.desc(),
+            postgresql_where=~is_active,
+            sqlite_where=is_active == false(),
+        ),
+        # Trigram index (pg_trgm) serving ILIKE '%term%' name search on PostgreSQL
+        Index(
+            'ix_example_name_trgm', 'name',
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+        ),
     )
     
 
+
+class TableVersion(Base):
+    """
+    Write generation per table, bumped by every write (see versioning.py)
+
+    Used to derive ETags without loading or hashing the rows themselves.
+    """
+    __tablename__ = "table_version"
+    
+    # Name of the versioned table (e.g. "example")
+    name = Column(String(64), primary_key=True)
+    
+    # Incremented by every committed write to the table
+    generation = Column(BigInteger, nullable=False, default=0, server_default="0")
+
+
+# Change event IDs of example writes on PostgreSQL (see versioning.py);
+# create_all skips it on databases without sequences
+example_generation = Sequence("example_generation", metadata=Base.metadata)
+
+
+class ExampleDailyStats(Base):
+    """
+    Rollup of example counts per entry day and active flag
+
+    Kept current by the write handlers in the same transaction as each write
+    (see stats.py), so dashboard statistics read O(days) rows instead of
+    counting the example table.
+    """
+    __tablename__ = "example_daily_stats"
+    
+    # Entry date (UTC) the counted examples were entered on
+    day = Column(Date, primary_key=True)
+    
+    # Active flag of the counted examples
+    is_active = Column(Boolean, primary_key=True)
+    
+    # Stripe of the (day, is_active) counter, so concurrent writers add to different rows
+    slot = Column(SmallInteger, primary_key=True, default=0, server_default="0")
+    
+    # This stripe's share of the examples entered on `day` with this active flag
+    count = Column(BigInteger, nullable=False, default=0, server_default="0")
@@ -0,0 +1,103 @@
+"""
+Precomputed OpenAPI JSON/YAML documents
+
+The spec is rendered once (on first request, after every route is
+registered) and kept as raw bytes, maximum-level gzip (and brotli, when
+available) copies and a strong ETag, so repeat fetches by client generators
+and gateways skip app.openapi() serialization, PyYAML's dumper and
+compression.
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Dict
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+from compression import SUPPORTED_ENCODINGS, compress, encoded_etag, negotiate_encoding
+from versioning import etag_matches
+
+# Highest compression levels: each document is compressed once per process
+DOCUMENT_LEVELS = {"gzip": 9, "br": 11}
+
+
+@dataclass(frozen=True)
+class CachedDocument:
+    """
+    One rendered representation of the spec, with its compressed encodings
+    """
+    media_type: str
+    body: bytes
+    encoded: Dict[str, bytes]
+    etag: str
+
+    @classmethod
+    def build(cls, media_type: str, body: bytes) -> "CachedDocument":
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        encoded = {encoding: compress(body, encoding, DOCUMENT_LEVELS[encoding]) for encoding in SUPPORTED_ENCODINGS}
+        return cls(media_type=media_type, body=body, encoded=encoded, etag=f'"{digest}"')
+
+
+class OpenAPIDocuments:
+    """
+    Lazily rendered, cached OpenAPI documents for an app
+    """
+
+    def __init__(self, app: FastAPI):
+        self.app = app
+        self._documents: Dict[str, CachedDocument] = {}
+
+    def render(self, kind: str) -> bytes:
+        """
+        Render the spec from app.openapi() ("json" matches FastAPI's own route)
+        """
+        schema = self.app.openapi()
+        if kind == "json":
+            return JSONResponse(content=schema).body
+        import yaml
+
+        return yaml.dump(schema, Dumper=yaml.SafeDumper, default_flow_style=False).encode()
+
+    def get(self, kind: str) -> CachedDocument:
+        document = self._documents.get(kind)
+        if document is None:
+            media_type = "application/json" if kind == "json" else "text/yaml"
+            document = self._documents[kind] = CachedDocument.build(media_type, self.render(kind))
+        return document
+
+    def invalidate(self) -> None:
+        """
+        Drop rendered documents (e.g. after routes are added at runtime)
+        """
+        self.app.openapi_schema = None
+        self._documents.clear()
+
+    def response(self, kind: str, request: Request) -> Response:
+        """
+        Serve a cached document, honoring If-None-Match and Accept-Encoding
+        """
+        document = self.get(kind)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        etag = encoded_etag(document.etag, encoding) if encoding else document.etag
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+        if etag_matches(request, document.etag):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            return Response(content=document.encoded[encoding], media_type=document.media_type, headers=headers)
+        return Response(content=document.body, media_type=document.media_type, headers=headers)
+
+
+def serve_json_from_cache(app: FastAPI, documents: OpenAPIDocuments) -> None:
+    """
+    Serve app.openapi_url from the cached JSON document
+
+    FastAPI registers its own openapi_url route when the app is created; it
+    is swapped for the cached one so Swagger UI keeps working unchanged.
+    """
+    app.router.routes = [route for route in app.router.routes if getattr(route, "path", None) != app.openapi_url]
+
+    async def openapi_json(request: Request) -> Response:
+        return documents.response("json", request)
+
+    app.add_route(app.openapi_url, openapi_json, include_in_schema=False)
@@ -0,0 +1,98 @@
+"""
+Keyset (cursor) pagination helpers for Example list endpoints
+
+Pages are ordered by (entry_date DESC, id DESC) and the cursor encodes the
+last row of the previous page, so fetching a deep page costs the same index
+range scan as fetching the first one. Ranked queries (search) prepend their
+rank to both the ordering and the cursor.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import MutableMapping, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from sqlalchemy import tuple_
+
+from models import Example
+
+# Default and maximum page sizes for list endpoints
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Stable ordering used by every paginated query (matches ix_example_entry_date_id)
+KEYSET_ORDER = (Example.entry_date.desc(), Example.id.desc())
+
+
+def encode_cursor(position: tuple) -> str:
+    """
+    Encode the position of a row, ([rank,] entry_date, id), as an opaque URL-safe cursor
+    """
+    *rank, entry_date, id = position
+    raw = json.dumps([*rank, entry_date.isoformat(), id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ranked: bool = False) -> Tuple:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or of the wrong kind
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if ranked:
+            rank, entry_date, id = values
+            return float(rank), datetime.fromisoformat(entry_date), int(id)
+        entry_date, id = values
+        return datetime.fromisoformat(entry_date), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def paginate(query, limit: int, cursor: Optional[str], rank=None, descending: bool = True):
+    """
+    Apply keyset ordering, the cursor position and limit + 1 to a select()
+
+    When `rank` is given, rows are ordered by it (descending) before the
+    entry_date/id tie-breakers. `descending=False` walks unranked pages
+    oldest first; the same indexes serve both directions. One extra row is
+    fetched so the caller can tell whether a next page exists.
+    """
+    keys = (Example.entry_date, Example.id) if rank is None else (rank, Example.entry_date, Example.id)
+    if descending:
+        query = query.order_by(*(key.desc() for key in keys))
+    else:
+        query = query.order_by(*(key.asc() for key in keys))
+    if cursor:
+        position = decode_cursor(cursor, ranked=rank is not None)
+        query = query.where(tuple_(*keys) < tuple_(*position) if descending else tuple_(*keys) > tuple_(*position))
+    return query.limit(limit + 1)
+
+
+def row_position(row) -> tuple:
+    """
+    Keyset position of an Example row
+    """
+    return row.entry_date, row.id
+
+
+def set_next_page(request: Request, headers: MutableMapping[str, str], rows: list, limit: int,
+                  position=row_position) -> list:
+    """
+    Trim the extra row fetched by paginate() and advertise the next page
+
+    Adds `X-Next-Cursor` and an RFC 8288 `Link: <...>; rel="next"` header to
+    `headers` when more rows exist. `position` maps a row to its cursor position.
+    """
+    if len(rows) <= limit:
+        return rows
+
+    rows = rows[:limit]
+    next_cursor = encode_cursor(position(rows[-1]))
+    next_url = request.url.include_query_params(cursor=next_cursor, limit=limit)
+    headers["X-Next-Cursor"] = next_cursor
+    headers["Link"] = f'<{next_url}>; rel="next"'
+    return rows
@@ -0,0 +1,216 @@
+"""
+Read replica routing for read-only endpoints
+
+When DATABASE_READ_URL lists one or more replicas (comma-separated), the
+list, search, by-id and export handlers get a session on a replica chosen round-robin,
+while writes keep using the primary session from database.get_async_db.
+
+A replica is taken out of rotation as soon as it fails to connect (or drops a
+connection) and is retried after REPLICA_RETRY_SECONDS, or earlier once the
+background health prober sees it answering again. With no healthy replica,
+reads fall back to the primary.
+
+Read-your-writes: a successful write sets a short-lived cookie and returns the
+same deadline in an X-Read-Primary-Until header, and reads carrying either go
+to the primary until replication has had READ_YOUR_WRITES_SECONDS to catch
+up, so clients always see their own changes. The header is for cross-origin
+clients (the SPA), whose fetches don't send cookies: they echo it back on reads.
+"""
+import itertools
+import os
+import threading
+import time
+from http.cookies import SimpleCookie
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from database import database_breaker, engine_options, new_async_session, to_async_url
+from metrics import instrument_engine, metrics_enabled
+
+# Cookie marking a client that recently wrote (value: epoch seconds until which it reads from the primary)
+STICKY_COOKIE = "db_read_primary_until"
+# Same value as a response header, echoed back as a request header by clients without cookies
+STICKY_HEADER = "X-Read-Primary-Until"
+
+WRITE_METHODS = frozenset(("POST", "PUT", "PATCH", "DELETE"))
+
+
+class Replica:
+    """
+    One read replica engine and its health state
+
+    The engine (and with it the database driver) is built on first use, like
+    database.get_async_engine, so importing the app stays cheap.
+    """
+
+    def __init__(self, url: str, retry_seconds: float):
+        self.url = url
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.retry_seconds = retry_seconds
+        self.down_until = 0.0
+        self.error: Optional[str] = None
+        self._engine = None
+        self._sessionmaker = None
+        self._lock = threading.Lock()
+
+    def _create(self) -> None:
+        if self._engine is not None:
+            return
+        async_url = to_async_url(self.url)
+        engine = create_async_engine(async_url, **engine_options(async_url))
+        if metrics_enabled():
+            instrument_engine(engine.sync_engine)
+        event.listen(engine.sync_engine, "handle_error", self._on_error)
+        self._sessionmaker = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        self._engine = engine
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            with self._lock:
+                self._create()
+        return self._engine
+
+    @property
+    def sessionmaker(self) -> async_sessionmaker:
+        if self._engine is None:
+            with self._lock:
+                self._create()
+        return self._sessionmaker
+
+    def _on_error(self, context) -> None:
+        # Connect failures (no connection yet) and dropped connections, not SQL errors
+        if context.connection is None or context.is_disconnect:
+            self.mark_down(str(context.original_exception))
+
+    def mark_down(self, error: str) -> None:
+        self.down_until = time.monotonic() + self.retry_seconds
+        self.error = error
+
+    def mark_up(self) -> None:
+        self.down_until = 0.0
+        self.error = None
+
+    @property
+    def available(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+
+class ReplicaSet:
+    """
+    Round-robin selection over the healthy replicas
+    """
+
+    def __init__(self, replicas: List[Replica], sticky_seconds: float):
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self._next = itertools.count()
+
+    def choose(self) -> Optional[Replica]:
+        """
+        Next available replica in round-robin order, or None if all are down
+        """
+        if not self.replicas:
+            return None
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.available:
+                return replica
+        return None
+
+    def session(self, request: Request) -> AsyncSession:
+        """
+        Session for a read-only request: a replica, or the primary for sticky clients and failover
+        """
+        replica = None if reads_own_writes(request) else self.choose()
+        if replica is None:
+            return new_async_session()
+        session = replica.sessionmaker()
+        session.info["replica"] = replica.name
+        return session
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            if replica._engine is not None:
+                await replica._engine.dispose()
+
+
+def reads_own_writes(request: Request) -> bool:
+    """
+    Whether the client wrote recently enough that replicas may not have its change yet
+    """
+    until = request.headers.get(STICKY_HEADER) or request.cookies.get(STICKY_COOKIE)
+    try:
+        return until is not None and float(until) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware setting the sticky-primary cookie and header on successful writes
+    """
+
+    def __init__(self, app, sticky_seconds: float):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and 200 <= message["status"] < 300:
+                until = f"{time.time() + self.sticky_seconds:.3f}"
+                cookie = SimpleCookie()
+                cookie[STICKY_COOKIE] = until
+                cookie[STICKY_COOKIE]["max-age"] = int(self.sticky_seconds) + 1
+                cookie[STICKY_COOKIE]["path"] = "/"
+                cookie[STICKY_COOKIE]["httponly"] = True
+                cookie[STICKY_COOKIE]["samesite"] = "lax"
+                header = cookie.output(header="").strip().encode("latin-1")
+                message = {**message, "headers": [
+                    *message.get("headers", []), (b"set-cookie", header), (STICKY_HEADER.lower().encode(), until.encode()),
+                ]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def create_replica_set() -> ReplicaSet:
+    """
+    Build the process-wide replica set from DATABASE_READ_URL (empty when unset)
+    """
+    urls = [url.strip() for url in os.getenv("DATABASE_READ_URL", "").split(",") if url.strip()]
+    retry_seconds = float(os.getenv("REPLICA_RETRY_SECONDS", "30"))
+    return ReplicaSet(
+        [Replica(url, retry_seconds) for url in urls],
+        sticky_seconds=float(os.getenv("READ_YOUR_WRITES_SECONDS", "5")),
+    )
+
+
+read_replicas = create_replica_set()
+
+
+async def get_async_read_db(request: Request):
+    """
+    Dependency function to get a session for read-only handlers
+
+    Yields:
+        AsyncSession: Replica session, or a primary session when no replica
+        is configured/available or the client has just written
+
+    Raises:
+        CircuitOpenError: when the primary is needed and its circuit breaker is open
+    """
+    session = read_replicas.session(request)
+    if "replica" not in session.info:
+        database_breaker.check()
+    async with session as db:
+        yield db
@@ -2,8 +2,8 @@
 Pydantic schemas (DTOs) for request/response validation
 """
 from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 
 
 class ExampleResponse(BaseModel):
@@ -16,6 +16,7 @@ class ExampleResponse(BaseModel):
     entryDate: datetime = Field(..., alias="entry_date")
     description: Optional[str] = None
     isActive: bool = Field(..., alias="is_active")
+    version: int = Field(..., description="Row version; send it as `If-Match` to update or delete only this version")
     
     class Config:
         from_attributes = True
@@ -27,7 +28,8 @@ class ExampleResponse(BaseModel):
                 "title": "Introduction",
                 "entryDate": "2025-12-02T12:00:00Z",
                 "description": "This is the first example entry",
-                "isActive": True
+                "isActive": True,
+                "version": 1
             }
         }
 
@@ -71,3 +73,86 @@ class UpdateExampleDto(BaseModel):
             }
         }
 
+
+
+class BulkUpdateExampleDto(UpdateExampleDto):
+    """
+    DTO for one item of a bulk update: the example ID plus the partial update
+    """
+    id: int = Field(..., description="ID of the example to update")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "id": 1,
+                "title": "Updated Title",
+                "isActive": False
+            }
+        }
+
+
+class BulkDeleteDto(BaseModel):
+    """
+    DTO for deleting several examples at once
+    """
+    ids: List[int] = Field(..., min_length=1, description="IDs of the examples to delete")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "ids": [1, 2, 3]
+            }
+        }
+
+
+class BulkItemResult(BaseModel):
+    """
+    Outcome of one item in a bulk request (index refers to the request array)
+    """
+    index: int
+    id: Optional[int] = None
+    success: bool
+    error: Optional[str] = None
+    example: Optional[ExampleResponse] = None
+
+
+class BulkResponse(BaseModel):
+    """
+    Response schema for bulk create/update/delete
+    """
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+
+class DailyExampleCount(BaseModel):
+    """
+    Examples entered on one day (UTC), by active flag
+    """
+    day: date
+    active: int
+    inactive: int
+    total: int
+
+
+class ExampleStatsResponse(BaseModel):
+    """
+    Response schema for example statistics (totals plus a per-day histogram)
+    """
+    total: int
+    active: int
+    inactive: int
+    days: List[DailyExampleCount]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "total": 3,
+                "active": 2,
+                "inactive": 1,
+                "days": [
+                    {"day": "2025-12-01", "active": 1, "inactive": 1, "total": 2},
+                    {"day": "2025-12-02", "active": 1, "inactive": 0, "total": 1}
+                ]
+            }
+        }
@@ -0,0 +1,49 @@
+"""
+Ranked substring search over example names
+
+On PostgreSQL the `ILIKE '%term%'` filter is served by the pg_trgm GIN index
+ix_example_name_trgm and matches are ranked by trigram similarity. Other
+databases (SQLite for local runs) keep the plain ILIKE scan and rank exact
+and prefix matches above other substring matches.
+"""
+from sqlalchemy import case, func, literal, select
+
+from models import Example
+from serialization import EXAMPLE_COLUMNS
+
+
+def rank_expression(dialect_name: str, term: str):
+    """
+    Relevance of an example name for the search term (higher is better)
+    """
+    if dialect_name == "postgresql":
+        return func.similarity(Example.name, term)
+
+    lowered_name = func.lower(Example.name)
+    lowered_term = term.lower()
+    return case(
+        (lowered_name == lowered_term, literal(1.0)),
+        (lowered_name.startswith(lowered_term, autoescape=True), literal(0.5)),
+        else_=literal(0.0),
+    )
+
+
+def search_query(dialect_name: str, term: str, columns=EXAMPLE_COLUMNS):
+    """
+    Build the search select and its rank expression
+
+    Returns:
+        tuple: (select of `columns` + rank, rank expression) to be paginated
+    """
+    rank = rank_expression(dialect_name, term)
+    # Plain ILIKE (not lower() LIKE) so PostgreSQL can use the trigram index on name
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    query = select(*columns, rank.label("rank")).where(Example.name.ilike(f"%{escaped}%", escape="\\"))
+    return query, rank
+
+
+def ranked_position(row) -> tuple:
+    """
+    Keyset position of a search row
+    """
+    return row.rank, row.entry_date, row.id
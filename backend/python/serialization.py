@@ -0,0 +1,129 @@
+"""
+Fast JSON encoding of Example rows for list endpoints
+
+List queries select plain column tuples instead of ORM objects and encode them
+straight to the ExampleResponse wire format with orjson, skipping ORM
+hydration and per-row pydantic validation. The output is identical to what
+FastAPI produces through `response_model=List[ExampleResponse]`, which stays
+declared on the routes so the OpenAPI schema doesn't change.
+
+Sparse fieldsets (`fields=id,name,isActive`) select only the requested
+columns and encode only those keys.
+"""
+from typing import Iterable, Optional, Tuple
+
+import orjson
+from fastapi import HTTPException
+
+from models import Example
+
+# Columns selected by fast-path queries, in wire-field order
+EXAMPLE_COLUMNS = (
+    Example.id,
+    Example.name,
+    Example.title,
+    Example.entry_date,
+    Example.description,
+    Example.is_active,
+    Example.version,
+)
+
+# Wire field names (the ExampleResponse serialization aliases), same order
+EXAMPLE_FIELDS = ("id", "name", "title", "entry_date", "description", "is_active", "version")
+
+# Names accepted by `fields=`: the camelCase DTO names, mapped to wire field names
+FIELD_NAMES = {
+    "id": "id",
+    "name": "name",
+    "title": "title",
+    "entryDate": "entry_date",
+    "description": "description",
+    "isActive": "is_active",
+    "version": "version",
+}
+
+COLUMNS_BY_FIELD = dict(zip(EXAMPLE_FIELDS, EXAMPLE_COLUMNS))
+
+# Columns every paginated select needs for the keyset cursor
+KEYSET_FIELDS = ("entry_date", "id")
+
+# UTC datetimes end in "Z", matching pydantic's datetime serialization
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def example_dict(row) -> dict:
+    """
+    Wire representation of a row selected with EXAMPLE_COLUMNS
+    """
+    return {
+        "id": row[0],
+        "name": row[1],
+        "title": row[2],
+        "entry_date": row[3],
+        "description": row[4],
+        "is_active": row[5],
+        "version": row[6],
+    }
+
+
+def encode_examples(rows: Iterable) -> bytes:
+    """
+    Encode rows selected with EXAMPLE_COLUMNS as a JSON array
+    """
+    return orjson.dumps([example_dict(row) for row in rows], option=ORJSON_OPTIONS)
+
+
+def encode_example_lines(rows: Iterable) -> bytes:
+    """
+    Encode rows selected with EXAMPLE_COLUMNS as newline-delimited JSON
+    """
+    return b"".join(orjson.dumps(example_dict(row), option=ORJSON_OPTIONS) + b"\n" for row in rows)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Wire field names requested by a `fields=` value, in response order
+
+    Accepts camelCase names (entryDate) as well as wire names (entry_date).
+    Returns None for the full representation (no parameter, or every field).
+
+    Raises:
+        HTTPException: 400 for unknown or empty field lists
+    """
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in FIELD_NAMES and name not in COLUMNS_BY_FIELD]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid fields: {', '.join(unknown) or '(empty)'}. Allowed: {', '.join(FIELD_NAMES)}",
+        )
+    selected = {FIELD_NAMES.get(name, name) for name in names}
+    if len(selected) == len(EXAMPLE_FIELDS):
+        return None
+    return tuple(field for field in EXAMPLE_FIELDS if field in selected)
+
+
+def select_columns(fields: Optional[Tuple[str, ...]]) -> tuple:
+    """
+    Columns to select for `fields`: the requested ones first, then the keyset columns pagination needs
+    """
+    if fields is None:
+        return EXAMPLE_COLUMNS
+    keyset = tuple(COLUMNS_BY_FIELD[field] for field in KEYSET_FIELDS if field not in fields)
+    return (*(COLUMNS_BY_FIELD[field] for field in fields), *keyset)
+
+
+def encode_sparse_examples(rows: Iterable, fields: Tuple[str, ...]) -> bytes:
+    """
+    Encode rows selected with select_columns(fields) as a JSON array of trimmed objects
+    """
+    return orjson.dumps([dict(zip(fields, row)) for row in rows], option=ORJSON_OPTIONS)
+
+
+def encode_sparse_example(row, fields: Tuple[str, ...]) -> bytes:
+    """
+    Encode one row selected with select_columns(fields) as a trimmed object
+    """
+    return orjson.dumps(dict(zip(fields, row)), option=ORJSON_OPTIONS)
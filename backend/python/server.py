@@ -0,0 +1,66 @@
+"""
+Uvicorn launch settings for development and production
+
+APP_ENV=development (the default) keeps the single auto-reloading process.
+APP_ENV=production runs WEB_CONCURRENCY workers (default: one per available
+core) on uvloop/httptools when installed, with keep-alive and listen backlog
+tuned for sitting behind a load balancer.
+
+Shutdown is left to uvicorn: on SIGTERM/SIGINT it closes the listening
+sockets, lets in-flight requests finish for up to SHUTDOWN_DRAIN_SECONDS and
+then runs the app's lifespan shutdown, which stops background tasks and
+disposes the connection pools.
+"""
+import importlib.util
+import os
+import tempfile
+
+
+def available_cores() -> int:
+    """
+    CPUs this process may run on (respects affinity/cpusets, unlike os.cpu_count())
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def server_options(port: int) -> dict:
+    """
+    Keyword arguments for uvicorn.run("main:app", ...) from environment variables
+    """
+    production = os.getenv("APP_ENV", "development").lower() == "production"
+    options = {
+        "host": os.getenv("HOST", "0.0.0.0"),
+        "port": port,
+        "log_level": os.getenv("LOG_LEVEL", "info"),
+        "timeout_graceful_shutdown": int(os.getenv("SHUTDOWN_DRAIN_SECONDS", "30")),
+    }
+    if not production:
+        # One app process (the reloader restarts it): the example cache may keep a local LRU
+        os.environ["CACHE_SINGLE_PROCESS"] = "true"
+        options["reload"] = True
+        return options
+
+    workers = int(os.getenv("WEB_CONCURRENCY") or available_cores())
+    # Workers inherit the environment; without a shared cache only a lone worker may cache locally
+    os.environ["CACHE_SINGLE_PROCESS"] = "true" if workers == 1 else "false"
+    if workers > 1 and not os.getenv("METRICS_MULTIPROC_DIR"):
+        # Fresh per launch, so /api/metrics sums this server's workers only
+        os.environ["METRICS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="technight-metrics-")
+    options.update(
+        workers=workers,
+        loop="uvloop" if installed("uvloop") else "asyncio",
+        http="httptools" if installed("httptools") else "h11",
+        # Longer than typical load balancer idle timeouts (60s) so the proxy closes idle connections first
+        timeout_keep_alive=int(os.getenv("KEEP_ALIVE_SECONDS", "65")),
+        backlog=int(os.getenv("BACKLOG", "2048")),
+        proxy_headers=True,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        access_log=os.getenv("ACCESS_LOG", "false").lower() in ("1", "true", "yes"),
+    )
+    return options
@@ -0,0 +1,174 @@
+"""
+Incrementally maintained example statistics
+
+example_daily_stats holds counts per (entry day, is_active). Every write
+handler adjusts it in the same transaction as the write, right before
+bump_version, so the dashboard's totals and per-day histogram are read from
+O(days) rollup rows instead of counting the example table.
+
+Each count is striped over STATS_SLOTS rows: on PostgreSQL a transaction
+adds to the slot of its connection (backend PID modulo STATS_SLOTS), so
+concurrent creates for today don't all queue on one row lock until commit.
+Reads sum the slots; a single slot may go negative, the sum never does.
+
+Adjustments are computed in SQL from the example rows themselves (an
+INSERT ... SELECT ... GROUP BY upsert), so they need no extra round trip to
+learn server-set entry dates and batch naturally for the bulk endpoints:
+
+- create: +1 after the INSERT
+- delete: -1 before the DELETE
+- update that may change isActive: -1 before and +1 after the UPDATE
+
+The -1 must count the rows exactly as the following UPDATE/DELETE will find
+them. On PostgreSQL it first locks them (SELECT ... FOR UPDATE, in id order),
+so a concurrent toggle or delete of the same example finishes first and,
+under READ COMMITTED, the rollup statement's fresh snapshot sees its result;
+the rows then stay locked until the write commits. SQLite needs no lock: the
+-1 is the transaction's first statement and a write, so it already holds the
+database's single write lock.
+
+Run `python stats.py rebuild` to backfill or repair the rollup from the
+example table (e.g. for databases created with create_all).
+"""
+import sys
+from datetime import date
+from typing import List, Optional, Sequence
+
+from sqlalchemy import BigInteger, cast, delete, func, literal, literal_column, select, text, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Example, ExampleDailyStats
+
+# Rows each (day, is_active) count is striped over on PostgreSQL
+STATS_SLOTS = 16
+
+
+def day_expression(dialect_name: str):
+    """
+    UTC calendar day of an example's entry_date
+    """
+    if dialect_name == "postgresql":
+        # A literal, not a bound parameter, so the GROUP BY matches the selected expression
+        return func.date(func.timezone(literal_column("'UTC'"), Example.entry_date))
+    # SQLite stores naive UTC timestamps as text
+    return func.date(Example.entry_date)
+
+
+def slot_expression(dialect_name: str):
+    """
+    Rollup slot the current transaction adds to
+    """
+    if dialect_name == "postgresql":
+        return func.pg_backend_pid() % literal_column(str(STATS_SLOTS))
+    # SQLite runs one writer at a time: nothing to spread
+    return literal_column("0")
+
+
+def rollup_counts(dialect_name: str, ids: Optional[Sequence[int]] = None, sign: int = 1):
+    """
+    SELECT of (day, is_active, slot, sign * count) over the given examples (all when ids is None)
+    """
+    day = day_expression(dialect_name)
+    # Ordered so concurrent upserts lock rollup rows in the same order
+    query = (
+        select(day, Example.is_active, slot_expression(dialect_name), func.count() * literal(sign))
+        .group_by(day, Example.is_active)
+        .order_by(day, Example.is_active)
+    )
+    # SQLite needs a WHERE clause to parse INSERT ... SELECT ... ON CONFLICT
+    return query.where(Example.id.in_(list(ids)) if ids is not None else true())
+
+
+def upsert_counts(dialect_name: str, counts):
+    """
+    INSERT ... SELECT that adds `counts` (a rollup_counts select) onto the rollup rows
+    """
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = dialect_insert(ExampleDailyStats).from_select(["day", "is_active", "slot", "count"], counts)
+    return statement.on_conflict_do_update(
+        index_elements=[ExampleDailyStats.day, ExampleDailyStats.is_active, ExampleDailyStats.slot],
+        set_={"count": ExampleDailyStats.count + statement.excluded["count"]},
+    )
+
+
+async def adjust_stats(db: AsyncSession, ids: Sequence[int], sign: int) -> None:
+    """
+    Add (+1) or remove (-1) the given examples' current rows to/from the rollup
+
+    Call after inserting (+1) or before deleting (-1), within the write's transaction.
+    """
+    if not ids:
+        return
+    dialect_name = db.get_bind().dialect.name
+    if sign < 0 and dialect_name == "postgresql":
+        # FOR UPDATE isn't allowed with GROUP BY, hence a statement of its own
+        await db.execute(
+            select(Example.id).where(Example.id.in_(list(ids))).order_by(Example.id).with_for_update()
+        )
+    await db.execute(upsert_counts(dialect_name, rollup_counts(dialect_name, ids, sign)))
+
+
+async def example_stats(db: AsyncSession, start: Optional[date] = None, end: Optional[date] = None) -> dict:
+    """
+    Totals and per-day counts, optionally limited to days in [start, end)
+    """
+    # sum(bigint) is numeric on PostgreSQL
+    total = cast(func.sum(ExampleDailyStats.count), BigInteger)
+    query = (
+        select(ExampleDailyStats.day, ExampleDailyStats.is_active, total)
+        .group_by(ExampleDailyStats.day, ExampleDailyStats.is_active)
+        .having(total > 0)
+    )
+    if start is not None:
+        query = query.where(ExampleDailyStats.day >= start)
+    if end is not None:
+        query = query.where(ExampleDailyStats.day < end)
+    result = await db.execute(query.order_by(ExampleDailyStats.day))
+
+    days: List[dict] = []
+    for day, is_active, count in result.all():
+        if not days or days[-1]["day"] != day:
+            days.append({"day": day, "active": 0, "inactive": 0, "total": 0})
+        days[-1]["active" if is_active else "inactive"] += count
+        days[-1]["total"] += count
+    return {
+        "total": sum(entry["total"] for entry in days),
+        "active": sum(entry["active"] for entry in days),
+        "inactive": sum(entry["inactive"] for entry in days),
+        "days": days,
+    }
+
+
+def rebuild(engine) -> int:
+    """
+    Recompute the whole rollup from the example table in one transaction
+
+    On PostgreSQL the example table is locked against writes (reads continue)
+    while the rollup is rebuilt, so no concurrent adjustment is lost.
+
+    Returns:
+        int: number of rollup rows written
+    """
+    with engine.begin() as connection:
+        dialect_name = connection.dialect.name
+        if dialect_name == "postgresql":
+            connection.execute(text("LOCK TABLE example IN SHARE MODE"))
+        connection.execute(delete(ExampleDailyStats))
+        connection.execute(upsert_counts(dialect_name, rollup_counts(dialect_name)))
+        return connection.execute(select(func.count()).select_from(ExampleDailyStats)).scalar()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        print("Usage: python3 stats.py rebuild")
+        print("\nRecomputes example_daily_stats from the example table (backfill or repair).")
+        sys.exit(1)
+
+    from database import Base, engine
+
+    if engine is None:
+        print("❌ DATABASE_URL is not configured")
+        sys.exit(1)
+    Base.metadata.create_all(engine, tables=[ExampleDailyStats.__table__])
+    print(f"✓ Rebuilt example_daily_stats: {rebuild(engine)} rows")
@@ -0,0 +1,238 @@
+"""
+ETag support for Example reads
+
+Collection reads (list, search, stats) use a per-table write generation,
+table_version.generation, which changes whenever committed data changes.
+Those reads fetch that one integer (a primary-key lookup, also on a replica)
+and answer `If-None-Match` with 304 before any example row is loaded or
+serialized.
+
+On PostgreSQL the generation is bumped after the write commits
+(publish_version), in a short transaction of its own that the worker shares
+between every write that committed while the previous bump ran, so
+concurrent writers neither hold nor wait for the generation's row lock in
+their own transactions. Within the transaction, bump_version only draws the
+write's change event ID from a sequence, which takes no lock. Bumping after
+commit can't label old rows with the new generation: a read fetches the
+generation before the rows, so at worst it labels rows it read after the
+commit with the old generation, and the next poll refetches them. On SQLite,
+which runs one writer at a time, bump_version updates the generation inside
+the write's transaction instead.
+
+A single example's ETag is its own row version (example.version, `"3"`), so
+by-id reads served from the example cache need no database round trip, and
+the tag a client read is what it sends back in `If-Match` on PUT/DELETE,
+checked in the UPDATE/DELETE statement itself.
+"""
+import asyncio
+import logging
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import Sequence, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from compression import strip_encoding_suffix
+from database import new_async_session
+from models import TableVersion
+
+EXAMPLE_TABLE = "example"
+
+# Post-commit generation bumps are retried with exponential backoff between these delays
+PUBLISH_RETRY_SECONDS = (0.05, 2.0)
+
+# Longest a writer waits for its bump before responding (the bump keeps retrying)
+PUBLISH_WAIT_SECONDS = 5.0
+
+logger = logging.getLogger(__name__)
+
+
+async def current_version(db: AsyncSession, table: str = EXAMPLE_TABLE) -> int:
+    """
+    Current write generation of a table (0 if it was never written)
+    """
+    result = await db.execute(select(TableVersion.generation).where(TableVersion.name == table))
+    return result.scalar() or 0
+
+
+async def increment_version(db: AsyncSession, table: str = EXAMPLE_TABLE) -> int:
+    """
+    Increment a table's write generation in the session's transaction; returns the new generation
+    """
+    result = await db.execute(
+        update(TableVersion)
+        .where(TableVersion.name == table)
+        .values(generation=TableVersion.generation + 1)
+        .returning(TableVersion.generation)
+        .execution_options(synchronize_session=False)
+    )
+    generation = result.scalar()
+    if generation is None:
+        # Databases created without the migrations (e.g. create_all on SQLite)
+        await db.execute(insert(TableVersion).values(name=table, generation=1))
+        generation = 1
+    return generation
+
+
+async def bump_version(db: AsyncSession, table: str = EXAMPLE_TABLE) -> int:
+    """
+    Generation of a write, as part of the caller's transaction (call right before commit)
+
+    Returns the value changefeed.py uses for the write's event IDs: unique
+    per write, but on PostgreSQL (drawn from the `<table>_generation`
+    sequence) not in commit order. Call publish_version once committed.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return (await db.execute(select(Sequence(f"{table}_generation").next_value()))).scalar()
+    return await increment_version(db, table)
+
+
+class VersionPublisher:
+    """
+    Post-commit generation bumps of one table, at most one running per worker
+
+    A writer that commits while a bump is running waits for the next one,
+    which every such writer shares: the bump must start after its commit.
+    A failed bump is logged and retried until it succeeds (a write whose
+    generation never moved would leave pollers on 304 for changed data);
+    writers that commit in the meantime are covered by the retry.
+    """
+
+    def __init__(self, table: str):
+        self.table = table
+        self._next: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and (self._task.done() or self._task.get_loop() is not loop):
+            self._task, self._next = None, None
+        if self._next is None:
+            self._next = loop.create_future()
+        future = self._next
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"publish-version-{self.table}")
+        # Shielded: a client disconnecting doesn't cancel a bump other writers wait for
+        try:
+            await asyncio.wait_for(asyncio.shield(future), PUBLISH_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            # The write has committed; collection ETags change once a retry succeeds
+            pass
+
+    async def _run(self) -> None:
+        while self._next is not None:
+            waiting, self._next = [self._next], None
+            delay, max_delay = PUBLISH_RETRY_SECONDS
+            while True:
+                try:
+                    await self._bump()
+                    break
+                except Exception:
+                    logger.warning(
+                        "Bumping the %s write generation failed, retrying in %.2fs", self.table, delay, exc_info=True,
+                    )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_delay)
+                # The retry starts after these writers committed, so it covers them too
+                if self._next is not None:
+                    waiting.append(self._next)
+                    self._next = None
+            for future in waiting:
+                future.set_result(None)
+        self._task = None
+
+    async def _bump(self) -> None:
+        db = new_async_session()
+        try:
+            await increment_version(db, self.table)
+            await db.commit()
+        finally:
+            await db.close()
+
+
+_publishers: Dict[str, VersionPublisher] = {}
+
+
+async def publish_version(db: AsyncSession, table: str = EXAMPLE_TABLE) -> None:
+    """
+    Make a committed write visible to collection ETags (call right after commit)
+
+    Returns once a bump that started after the commit has succeeded, or
+    after PUBLISH_WAIT_SECONDS while it is being retried. A no-op where
+    bump_version already bumped the generation in the write's transaction.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    await _publishers.setdefault(table, VersionPublisher(table)).publish()
+
+
+def make_etag(version: int, request: Request) -> str:
+    """
+    Strong ETag for a resource at a table version
+
+    The path and query string are folded in so different representations
+    (pages, filters) never share a validator.
+    """
+    representation = f"{request.url.path}?{request.url.query}".encode()
+    return f'"{version}-{zlib.crc32(representation):08x}"'
+
+
+def example_etag(version: int, fields: Optional[Tuple[str, ...]] = None) -> str:
+    """
+    Strong ETag of one example at a row version
+
+    Sparse representations (`fields=`) get the field list folded in, since
+    they differ from the full one at the same version.
+    """
+    if fields is None:
+        return f'"{version}"'
+    return f'"{version}-{zlib.crc32(",".join(fields).encode()):08x}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Whether the request's If-None-Match header matches the ETag
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # Compressed representations carry "-gzip"/"-br" suffixed ETags (see compression.py)
+    candidates = [strip_encoding_suffix(candidate.strip()) for candidate in header.split(",")]
+    # Weak comparison per RFC 9110 for If-None-Match
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def if_match_versions(header: Optional[str]) -> Optional[List[int]]:
+    """
+    Example versions whose ETag an If-Match header lists
+
+    Each entity-tag is compared with the ETag a single example has at some
+    version ('"3"', see example_etag), ignoring the encoding suffix of
+    compressed responses. Weak tags never match under strong comparison (RFC
+    9110), and other tags (a list or sparse-read ETag, malformed values) match
+    no version, so a header listing only such tags fails with 412 once the
+    example is found to exist.
+
+    Returns None when the header sets no version precondition: no header, or
+    `*`, which only requires the example to exist (a missing example is a 404
+    with or without it).
+    """
+    if not header:
+        return None
+    versions = []
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return None
+        tag = strip_encoding_suffix(candidate)
+        if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+            versions.append(int(tag[1:-1]))
+    return versions
+
+
+def not_modified(etag: str) -> Response:
+    """
+    304 response carrying the validator
+    """
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
@@ -35,30 +35,43 @@ export interface ApiError {
   status?: number;
 }
 
-// Generic fetch helper with error handling
-async function apiFetch<T>(endpoint: string, options?: RequestInit): Promise<T> {
+// Largest page the list endpoints serve (MAX_PAGE_SIZE on the backend)
+const PAGE_SIZE = 1000;
+
+// Read-your-writes: after a write the API returns the time (epoch seconds) until which
+// our reads must go to the primary database. Cross-origin fetches don't send its
+// cookie, so the deadline is echoed back as a request header instead.
+const READ_PRIMARY_HEADER = 'X-Read-Primary-Until';
+let readPrimaryUntil: string | null = null;
+
+// Fetch with error handling; resolves to the successful response
+async function apiRequest(endpoint: string, options?: RequestInit): Promise<Response> {
   const url = `${API_BASE_URL}${endpoint}`;
 
   try {
+    const sticky = readPrimaryUntil && Number(readPrimaryUntil) > Date.now() / 1000
+      ? { [READ_PRIMARY_HEADER]: readPrimaryUntil }
+      : {};
     const response = await fetch(url, {
       ...options,
       headers: {
         'Content-Type': 'application/json',
+        ...sticky,
         ...options?.headers,
       },
     });
 
+    const until = response.headers.get(READ_PRIMARY_HEADER);
+    if (until) {
+      readPrimaryUntil = until;
+    }
+
     if (!response.ok) {
       const errorText = await response.text();
       throw new Error(`HTTP error! status: ${response.status}, message: ${errorText}`);
     }
 
-    // Handle 204 No Content
-    if (response.status === 204) {
-      return {} as T;
-    }
-
-    return await response.json();
+    return response;
   } catch (error) {
     if (error instanceof Error) {
       throw error;
@@ -67,6 +80,34 @@ async function apiFetch<T>(endpoint: string, options?: RequestInit): Promise<T>
   }
 }
 
+// Generic fetch helper with error handling
+async function apiFetch<T>(endpoint: string, options?: RequestInit): Promise<T> {
+  const response = await apiRequest(endpoint, options);
+
+  // Handle 204 No Content
+  if (response.status === 204) {
+    return {} as T;
+  }
+
+  return await response.json();
+}
+
+// Fetch every page of a paginated list endpoint, following X-Next-Cursor
+async function apiFetchAll<T>(endpoint: string): Promise<T[]> {
+  const separator = endpoint.includes('?') ? '&' : '?';
+  const items: T[] = [];
+  let cursor: string | null = null;
+
+  do {
+    const page = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+    const response = await apiRequest(`${endpoint}${separator}limit=${PAGE_SIZE}${page}`);
+    items.push(...(await response.json() as T[]));
+    cursor = response.headers.get('X-Next-Cursor');
+  } while (cursor);
+
+  return items;
+}
+
 // API Methods
 export const api = {
   // Health check endpoint
@@ -76,9 +117,9 @@ export const api = {
 
   // Examples endpoints
   examples: {
-    getAll: () => apiFetch<Example[]>('/api/examples'),
+    getAll: () => apiFetchAll<Example>('/api/examples'),
     getById: (id: number) => apiFetch<Example>(`/api/examples/${id}`),
-    search: (name: string) => apiFetch<Example[]>(`/api/examples/search?name=${encodeURIComponent(name)}`),
+    search: (name: string) => apiFetchAll<Example>(`/api/examples/search?name=${encodeURIComponent(name)}`),
     create: (data: CreateExampleDto) => apiFetch<Example>('/api/examples', {
       method: 'POST',
       body: JSON.stringify(data),